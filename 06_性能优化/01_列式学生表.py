@@ -0,0 +1,281 @@
+"""
+Python 性能优化 - 列式学生表
+在 01_基础语法/01_变量和数据类型 中用「dict 的列表」保存学生，这里改成「按列存储」（struct-of-arrays），
+每一列是一个 array 或去重编码的字符串列，记录数到百万级时内存能省下一大截
+"""
+
+import sys
+import time
+import tracemalloc
+from array import array
+
+# ==================== 为什么 dict 列表占内存 ====================
+print("=== dict 列表的开销 ===")
+
+# 每个学生 dict 都有自己的哈希表：8 个键 → 每条记录约 300+ 字节的 dict 头和槽位
+# 数字 90、20 之类的小整数会被缓存共享，但 dict 本身无法共享
+# 列式存储：所有学生的 age 放进一个 array('h')，每人只占 2 字节
+
+student = {
+    "name": "张三",
+    "age": 20,
+    "gender": "男",
+    "score": 90,
+    "class": "1班",
+    "id": "1234567890",
+    "phone": "1234567890",
+    "email": "zhangsan@example.com",
+}
+print(f"单个学生 dict 本身: {sys.getsizeof(student)} 字节（还不含键值对象）")
+
+# ==================== 字符串列：字典编码 ====================
+print("\n=== 字典编码的字符串列 ===")
+
+# 性别、班级这类「取值很少」的列，只保存一份去重后的字符串，每行只存一个小整数编码
+# 类似数据库里的枚举 / Pandas 的 category 类型
+
+
+class CategoryColumn:
+    """低基数字符串列：values 保存去重后的字符串，codes 保存每行的编号"""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self):
+        self.values = []  # 编号 → 字符串
+        self._lookup = {}  # 字符串 → 编号
+        self.codes = array("H")  # 每行一个 2 字节编号（最多 65536 种取值）
+
+    def _encode(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self._encode(value))
+
+    def pop(self, index=-1):
+        return self.values[self.codes.pop(index)]
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+gender_col = CategoryColumn()
+for g in ["男", "女", "男", "男"]:
+    gender_col.append(g)
+print(f"去重后的取值: {gender_col.values}, 每行编号: {gender_col.codes.tolist()}")
+
+# ==================== StudentTable ====================
+print("\n=== StudentTable ===")
+
+
+class StudentRow:
+    """
+    行视图：只保存「表 + 行号」，访问字段时再去对应列里取
+    用 __slots__ 去掉实例 __dict__，遍历时创建的临时对象非常小
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, field):
+        return self._table._columns[field][self._index]
+
+    def keys(self):
+        return StudentTable.FIELDS
+
+    def to_dict(self):
+        """转回普通 dict（兼容原来的写法）"""
+        return {field: self[field] for field in StudentTable.FIELDS}
+
+    def __eq__(self, other):
+        if isinstance(other, StudentRow):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"StudentRow({self.to_dict()})"
+
+
+class StudentTable:
+    """
+    按列存储的学生表，支持与 studentList 相同的 append / remove / pop / 遍历
+    - 数值列用 array（age、score 各 2 字节）
+    - 低基数字符串列（gender、class）用字典编码
+    - 高基数字符串列（name、id、phone、email）用 list 保存字符串引用
+    """
+
+    FIELDS = ("name", "age", "gender", "score", "class", "id", "phone", "email")
+
+    def __init__(self, rows=()):
+        self._columns = {
+            "name": [],
+            "age": array("h"),
+            "gender": CategoryColumn(),
+            "score": array("h"),
+            "class": CategoryColumn(),
+            "id": [],
+            "phone": [],
+            "email": [],
+        }
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        """
+        追加一条记录，row 可以是 dict 或 StudentRow
+        某一列拒绝了这个值（如 score=90.5 放不进 array('h')）时，已经追加的列会撤回，
+        各列长度始终一致，不会让后面的行错位
+        """
+        values = [row[field] for field in self.FIELDS]  # 缺字段时在改动任何列之前就报错
+        done = []
+        try:
+            for field, value in zip(self.FIELDS, values):
+                column = self._columns[field]
+                column.append(value)
+                done.append(column)
+        except BaseException:
+            for column in done:
+                column.pop()
+            raise
+
+    def pop(self, index=-1):
+        """删除并返回一条记录（返回 dict，因为行已经不在表里了）"""
+        if not len(self):
+            raise IndexError("pop from empty StudentTable")
+        return {field: self._columns[field].pop(index) for field in self.FIELDS}
+
+    def index(self, row):
+        """找到第一条与 row 相等的记录的行号，没有则抛出 ValueError"""
+        # 先用 id 列缩小范围，再比较整行，避免每行都构造 dict
+        ids = self._columns["id"]
+        target_id = row["id"]
+        for i, value in enumerate(ids):
+            if value == target_id and self[i] == row:
+                return i
+        raise ValueError("StudentTable.index(x): x not in table")
+
+    def remove(self, row):
+        """删除第一条与 row 相等的记录（行为同 list.remove）"""
+        self.pop(self.index(row))
+
+    def column(self, field):
+        """直接拿到某一列，做聚合时比逐行遍历快得多"""
+        col = self._columns[field]
+        if isinstance(col, CategoryColumn):
+            return [col.values[c] for c in col.codes]
+        return col
+
+    def __getitem__(self, index):
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("StudentTable index out of range")
+        return StudentRow(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield StudentRow(self, i)
+
+    def __len__(self):
+        return len(self._columns["id"])
+
+    def __repr__(self):
+        return f"StudentTable({len(self)} rows)"
+
+
+# 用法与 studentList 一致
+table = StudentTable([student, student, student])
+for row in table:
+    print(row["name"], row["score"], row["class"])
+
+table.append(student)
+print(f"append 后: {table}")
+
+table.remove(student)
+print(f"remove 后: {table}")
+
+popped = table.pop()
+print(f"pop 出: {popped['name']}, 剩余: {table}")
+
+try:
+    table.append({**student, "score": 90.5})
+except TypeError as e:
+    print(f"score=90.5 被拒绝: {e}，表仍是 {table}")
+assert len({len(col) for col in table._columns.values()}) == 1
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：内存与遍历速度 ===")
+
+N = 100_000  # 演示用；换成几百万时差距同样成立
+
+
+def make_student(i):
+    return {
+        "name": f"学生{i}",
+        "age": 18 + i % 10,
+        "gender": "男" if i % 2 else "女",
+        "score": i % 101,
+        "class": f"{i % 20 + 1}班",
+        "id": f"{i:010d}",
+        "phone": f"138{i:08d}",
+        "email": f"s{i}@example.com",
+    }
+
+
+def measure(build):
+    """返回 (结果对象, 构建后占用的字节数)"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+# 两种结构都要保存 name/id/phone/email 字符串，差异主要来自 dict 本身
+dict_list, dict_bytes = measure(lambda: [make_student(i) for i in range(N)])
+col_table, col_bytes = measure(lambda: StudentTable(make_student(i) for i in range(N)))
+
+print(f"dict 列表:     {dict_bytes / N:7.1f} 字节/行")
+print(f"StudentTable: {col_bytes / N:7.1f} 字节/行")
+
+# 遍历求平均分
+start = time.perf_counter()
+avg1 = sum(s["score"] for s in dict_list) / N
+t_dict = time.perf_counter() - start
+
+start = time.perf_counter()
+avg2 = sum(row["score"] for row in col_table) / N
+t_rows = time.perf_counter() - start
+
+start = time.perf_counter()
+avg3 = sum(col_table.column("score")) / N
+t_col = time.perf_counter() - start
+
+assert avg1 == avg2 == avg3
+print(f"dict 列表逐行:    {N / t_dict / 1e6:6.2f} M 行/秒")
+print(f"行视图逐行:       {N / t_rows / 1e6:6.2f} M 行/秒（每行建一个小对象，比 dict 慢）")
+print(f"直接按列聚合:     {N / t_col / 1e6:6.2f} M 行/秒（列式存储真正的优势）")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 列式存储：每个字段一列，数值列用 array，省掉每行一个 dict")
+print("• 低基数字符串用字典编码：只存一份字符串 + 每行一个小整数")
+print("• __slots__ 行视图：兼容 row['name'] 的写法，但聚合时应直接用 column()")
+
+print("\n=== 练习题 ===")
+print("1. 给 StudentTable 增加 __setitem__，支持 table[i] = {...} 整行替换")
+print("2. 把 score 列改成 array('d')，支持小数分数，对比内存变化")
+print("3. 用 column('class') 统计每个班的人数（提示：collections.Counter）")
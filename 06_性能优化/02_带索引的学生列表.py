@@ -0,0 +1,248 @@
+"""
+Python 性能优化 - 带索引的学生列表
+01_基础语法/01_变量和数据类型 里的 studentList.remove(student) 要从头逐个比较整个 dict，是 O(n)
+这里在 id / phone / email 上维护哈希索引（dict），按键删除、查找、更新都是 O(1)
+"""
+
+import random
+import time
+
+# ==================== list.remove 为什么慢 ====================
+print("=== list.remove 的代价 ===")
+
+# list.remove(x) 会从第 0 个元素开始做 ==，dict 的 == 要比较所有键值对
+# 删完之后还要把后面的元素整体前移，所以最坏每次 O(n)
+# 数据库的做法：给常用查询字段建「索引」—— Python 里最现成的索引就是 dict
+
+# ==================== 自定义异常 ====================
+
+
+class DuplicateKeyError(ValueError):
+    """唯一索引冲突（同一个 id/phone/email 出现两次）"""
+
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+        super().__init__(f"唯一索引冲突: {field}={value!r} 已存在")
+
+
+# ==================== IndexedStudentList ====================
+print("\n=== IndexedStudentList ===")
+
+
+class IndexedStudentList:
+    """
+    带二级哈希索引的学生集合
+    - _rows: 行号 → 记录，dict 保持插入顺序，删除任意一行都是 O(1)
+    - _indexes: 字段 → {字段值: 行号}（unique=True）或 {字段值: {行号, ...}}（unique=False）
+    """
+
+    INDEXED_FIELDS = ("id", "phone", "email")
+
+    def __init__(self, rows=(), indexed_fields=INDEXED_FIELDS, unique=True):
+        self.indexed_fields = tuple(indexed_fields)
+        self.unique = unique
+        self._rows = {}
+        self._next_rid = 0
+        self._indexes = {field: {} for field in self.indexed_fields}
+        for row in rows:
+            self.append(row)
+
+    # ---------- 索引维护 ----------
+    def _check_unique(self, record, ignore_rid=None):
+        """插入/更新前检查唯一约束，先检查再写入，冲突时不会留下半更新的索引"""
+        if not self.unique:
+            return
+        for field in self.indexed_fields:
+            rid = self._indexes[field].get(record[field])
+            if rid is not None and rid != ignore_rid:
+                raise DuplicateKeyError(field, record[field])
+
+    def _index_add(self, rid, record):
+        for field in self.indexed_fields:
+            index = self._indexes[field]
+            if self.unique:
+                index[record[field]] = rid
+            else:
+                index.setdefault(record[field], set()).add(rid)
+
+    def _index_discard(self, rid, record):
+        for field in self.indexed_fields:
+            index = self._indexes[field]
+            if self.unique:
+                del index[record[field]]
+            else:
+                rids = index[record[field]]
+                rids.discard(rid)
+                if not rids:
+                    del index[record[field]]
+
+    def _rids(self, field, value):
+        """按索引字段取行号列表"""
+        if field not in self._indexes:
+            raise KeyError(f"{field} 没有建立索引")
+        hit = self._indexes[field].get(value)
+        if hit is None:
+            return []
+        return [hit] if self.unique else sorted(hit)
+
+    # ---------- 与 list 相同的接口 ----------
+    def append(self, record):
+        """追加一条记录（存的是副本，外部修改原 dict 不会让索引失效）"""
+        record = dict(record)
+        self._check_unique(record)
+        rid = self._next_rid
+        self._next_rid += 1
+        self._rows[rid] = record
+        self._index_add(rid, record)
+
+    def pop(self):
+        """删除并返回最后插入的记录"""
+        if not self._rows:
+            raise IndexError("pop from empty IndexedStudentList")
+        rid, record = self._rows.popitem()  # dict.popitem() 按 LIFO 顺序，O(1)
+        self._index_discard(rid, record)
+        return record
+
+    def remove(self, record):
+        """删除与 record 相等的第一条记录：先用索引定位，再比较整行"""
+        field = self.indexed_fields[0]
+        for rid in self._rids(field, record[field]):
+            if self._rows[rid] == record:
+                self._index_discard(rid, self._rows.pop(rid))
+                return
+        raise ValueError("IndexedStudentList.remove(x): x not in list")
+
+    def __iter__(self):
+        return iter(self._rows.values())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, record):
+        field = self.indexed_fields[0]
+        return any(self._rows[rid] == record for rid in self._rids(field, record[field]))
+
+    def __repr__(self):
+        return f"IndexedStudentList({list(self._rows.values())})"
+
+    # ---------- 按键操作（O(1)）----------
+    def find(self, field, value):
+        """返回所有 field == value 的记录（唯一模式下最多一条）"""
+        return [self._rows[rid] for rid in self._rids(field, value)]
+
+    def get(self, field, value, default=None):
+        """返回第一条 field == value 的记录，没有则返回 default"""
+        found = self._rids(field, value)
+        return self._rows[found[0]] if found else default
+
+    def remove_by(self, field, value):
+        """删除所有 field == value 的记录，返回删除条数"""
+        rids = self._rids(field, value)
+        for rid in rids:
+            self._index_discard(rid, self._rows.pop(rid))
+        return len(rids)
+
+    def update(self, field, value, **changes):
+        """
+        修改 field == value 的记录，索引字段变化时同步更新索引
+        返回修改的条数
+        """
+        rids = self._rids(field, value)
+        for rid in rids:
+            old = self._rows[rid]
+            new = {**old, **changes}
+            self._check_unique(new, ignore_rid=rid)
+            self._index_discard(rid, old)
+            self._rows[rid] = new
+            self._index_add(rid, new)
+        return len(rids)
+
+
+student = {
+    "name": "张三",
+    "age": 20,
+    "gender": "男",
+    "score": 90,
+    "class": "1班",
+    "id": "1234567890",
+    "phone": "1234567890",
+    "email": "zhangsan@example.com",
+}
+lisi = {**student, "name": "李四", "id": "2", "phone": "13800000002", "email": "lisi@example.com"}
+
+students = IndexedStudentList([student, lisi])
+print(f"按 phone 查找: {students.get('phone', '13800000002')['name']}")
+
+students.update("id", "2", email="lisi@new.com", score=95)
+print(f"按新 email 查找: {students.get('email', 'lisi@new.com')}")
+print(f"旧 email 已从索引移除: {students.get('email', 'lisi@example.com')}")
+
+# 唯一模式：重复 append 同一个学生会报错（原来的 studentList 允许重复）
+try:
+    students.append(student)
+except DuplicateKeyError as e:
+    print(f"捕获: {e}")
+
+# 非唯一模式：允许重复，行为和 studentList 一样
+dup_list = IndexedStudentList([student, student, student], unique=False)
+print(f"非唯一模式长度: {len(dup_list)}, id 命中 {len(dup_list.find('id', student['id']))} 条")
+dup_list.remove(student)
+dup_list.pop()
+print(f"remove + pop 后长度: {len(dup_list)}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：反复删除/追加 ===")
+
+N = 20_000  # list.remove 是 O(n)，总代价 O(n²)，N 再大演示就要跑很久
+CHURN = 2_000
+
+
+def make_student(i):
+    return {
+        "name": f"学生{i}",
+        "score": i % 101,
+        "id": f"{i:010d}",
+        "phone": f"138{i:08d}",
+        "email": f"s{i}@example.com",
+    }
+
+
+records = [make_student(i) for i in range(N)]
+victims = random.Random(42).sample(records, CHURN)
+
+plain = list(records)
+start = time.perf_counter()
+for r in victims:
+    plain.remove(r)
+    plain.append(r)
+t_list = time.perf_counter() - start
+
+indexed = IndexedStudentList(records)
+start = time.perf_counter()
+for r in victims:
+    indexed.remove(r)
+    indexed.append(r)
+t_indexed = time.perf_counter() - start
+
+start = time.perf_counter()
+for r in victims:
+    indexed.remove_by("id", r["id"])
+    indexed.append(r)
+t_by_key = time.perf_counter() - start
+
+assert len(plain) == len(indexed) == N
+print(f"list.remove + append:         {t_list * 1000:8.2f} ms")
+print(f"索引 remove(record) + append: {t_indexed * 1000:8.2f} ms（约 {t_list / t_indexed:.0f} 倍）")
+print(f"索引 remove_by(id) + append:  {t_by_key * 1000:8.2f} ms")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 索引就是「字段值 → 行」的 dict，查找/删除 O(1)，代价是多占内存、写入时要同步维护")
+print("• 用 dict 代替 list 存行：dict 保序，删除中间元素不需要整体前移")
+print("• 先检查约束再写入，避免异常时索引与数据不一致")
+
+print("\n=== 练习题 ===")
+print("1. 给 IndexedStudentList 增加 find_range('score', 80, 90)，想想哈希索引为什么做不到 O(log n)")
+print("2. 在非唯一模式下给 name 建索引，统计重名学生")
+print("3. 写一个 validate() 方法，检查所有索引与 _rows 是否一致")
@@ -0,0 +1,232 @@
+"""
+Python 性能优化 - 批量数值解析
+05_文件和IO/03_异常处理 里的 parse_number 靠 try/except ValueError 逐个解析，
+一列数据里坏值很多时，抛异常、捕获异常会让逐个解析明显变慢
+这里把一整列字符串解析成紧凑的 array('q') / array('d')，另给一个「有效位」位图，坏值不抛异常
+"""
+
+import operator
+import random
+import re
+import time
+from array import array
+from itertools import repeat
+
+# ==================== 异常为什么贵 ====================
+print("=== 异常的代价 ===")
+
+# int("abc") 失败时要创建异常对象、拼错误消息、展开调用栈，再由 except 匹配类型
+# 只偶尔失败时 try/except 很划算（EAFP 风格）；一列里 30% 都是坏值时，逐个解析会慢约 3 倍
+# 思路：
+# 1. 快路径：整块直接 array('q', map(int, chunk))，全是好值时完全在 C 里完成
+# 2. 慢路径：快路径失败后，先整体算出哪些格子合法，把坏格子换成 "0" 后再整体转换，全程不抛异常
+
+
+# ==================== 位图工具 ====================
+
+
+def pack_bits(flags):
+    """
+    把 0/1 序列打包成位图：第 i 个元素对应第 i//8 个字节的第 i%8 位（低位在前，与 Arrow 相同）
+    利用切片 + int.from_bytes 一次处理一整列，没有逐元素的 Python 循环
+    """
+    raw = bytes(flags)  # 每个元素一个字节，值为 0 或 1
+    size = (len(raw) + 7) // 8
+    packed = 0
+    for bit in range(8):
+        lane = raw[bit::8]  # 所有「第 bit 位」的元素
+        packed |= int.from_bytes(lane, "little") << bit
+    return bytearray(packed.to_bytes(size, "little"))
+
+
+def is_valid(mask, i):
+    """位图里第 i 位是否为 1"""
+    return bool(mask[i >> 3] >> (i & 7) & 1)
+
+
+# ==================== 解析规则 ====================
+
+# 与 int() / float() 接受的写法完全一致（单元格先 strip 掉首尾空白）：正负号、下划线分组、科学计数法、inf/nan
+# 必须「完全」一致：快路径直接用 float()，慢路径用正则，同一个格子不能因为邻居不同而结果不同
+# float 的语法（见官方文档「float()」）：
+#   数字   = 整数部分 [. [小数部分]] [指数]  |  . 小数部分 [指数]      （"1."、"1.e5"、".5" 都合法）
+#   各部分 = 数字之间可以有单个下划线
+_DIGITS = r"\d(?:_?\d)*"
+RULES = {
+    "q": (re.compile(r"[+-]?\d+(?:_\d+)*"), int),
+    "d": (re.compile(rf"[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:e[+-]?{_DIGITS})?"
+                     r"|inf(?:inity)?|nan)", re.I), float),
+}
+INT64_MIN, INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def parse_number(s):
+    """
+    对字符串输入与 05_文件和IO/03_异常处理 中的 parse_number 行为相同（解析失败返回 None），
+    但先用正则判断，不再依赖抛出 ValueError / TypeError
+    """
+    if isinstance(s, str):
+        return int(s) if RULES["q"][0].fullmatch(s.strip()) else None
+    if isinstance(s, (int, float)):
+        return int(s)
+    return None
+
+
+class ParsedColumn:
+    """解析结果：values 是紧凑数组（坏值位置填 0），mask 是有效位图"""
+
+    __slots__ = ("values", "mask", "invalid_count")
+
+    def __init__(self, values, mask, invalid_count):
+        self.values = values
+        self.mask = mask
+        self.invalid_count = invalid_count
+
+    def __len__(self):
+        return len(self.values)
+
+    def is_valid(self, i):
+        return is_valid(self.mask, i)
+
+    def valid_values(self):
+        """只取合法值（跳过坏值）"""
+        return [v for i, v in enumerate(self.values) if is_valid(self.mask, i)]
+
+    def __repr__(self):
+        return f"ParsedColumn({len(self)} 个值, {self.invalid_count} 个无效)"
+
+
+def _parse_chunk_masked(chunk, kind):
+    """
+    慢路径（仍然没有逐元素的 Python 循环，全部是 C 实现的 map）：
+    1. 求出每格是否合法的 0/1 标记
+    2. zip(repeat("0"), 单元格) 得到 ("0", 单元格) 对，按标记取下标：坏格子换成 "0"，好格子保留
+    3. 再整体 map(int/float, ...)
+    """
+    rule, convert = RULES[kind]
+    stripped = list(map(str.strip, chunk))  # 非字符串会在这里抛 TypeError，交给兜底路径
+    if kind == "q":
+        if any(map(str.__contains__, stripped, repeat("_"))):
+            raise ValueError("含下划线写法，交给兜底路径按 int() 规则逐格判断")
+        # 去掉符号后全是十进制数字 ⇔ 合法整数（"+-5" 这类漏网的会让 int 抛错，同样走兜底路径）
+        flags = bytes(map(str.isdecimal, map(str.lstrip, stripped, repeat("+-"))))
+    else:
+        flags = bytes(map(bool, map(rule.fullmatch, stripped)))
+    picked = map(operator.getitem, zip(repeat("0"), stripped), flags)
+    return array(kind, map(convert, picked)), flags
+
+
+def _parse_chunk_slow(chunk, kind):
+    """兜底路径：逐格判断（含下划线、非字符串、超出 64 位范围时才会用到）"""
+    rule, convert = RULES[kind]
+    values, flags = array(kind), bytearray()
+    for s in chunk:
+        v = 0
+        ok = isinstance(s, str) and rule.fullmatch(s.strip()) is not None
+        if ok:
+            v = convert(s)
+            if kind == "q" and not INT64_MIN <= v <= INT64_MAX:
+                v, ok = 0, False  # 超出 64 位整数范围，同样视为无效
+        values.append(v)
+        flags.append(ok)
+    return values, flags
+
+
+def parse_numbers(strings, kind="q", chunk_size=65_536):
+    """
+    批量解析一列字符串
+    kind: "q" → array('q') 64 位整数；"d" → array('d') 双精度浮点
+    返回 ParsedColumn，坏值不会抛出异常
+    """
+    if kind not in RULES:
+        raise ValueError("kind 只能是 'q'（整数）或 'd'（浮点数）")
+    convert = RULES[kind][1]
+    values = array(kind)
+    flags = bytearray()
+    for start in range(0, len(strings), chunk_size):
+        chunk = strings[start:start + chunk_size]
+        try:
+            # 快路径：整块合法时一次完成，只在块级别付出一次 try 的代价
+            values.extend(array(kind, map(convert, chunk)))
+            flags.extend(b"\x01" * len(chunk))
+            continue
+        except (ValueError, TypeError, OverflowError):
+            pass
+        try:
+            chunk_values, chunk_flags = _parse_chunk_masked(chunk, kind)
+        except (ValueError, TypeError, OverflowError):
+            chunk_values, chunk_flags = _parse_chunk_slow(chunk, kind)
+        values.extend(chunk_values)
+        flags.extend(chunk_flags)
+    return ParsedColumn(values, pack_bits(flags), len(flags) - sum(flags))
+
+
+# ==================== 演示 ====================
+print("\n=== parse_numbers ===")
+
+print(f"parse_number('42'): {parse_number('42')}")
+print(f"parse_number('x'): {parse_number('x')}")
+
+column = parse_numbers(["123", " -7 ", "1_000", "abc", "", "99999999999999999999"])
+print(f"整数列: {column}, 值: {column.values.tolist()}")
+print(f"有效位: {[column.is_valid(i) for i in range(len(column))]}")
+print(f"合法值: {column.valid_values()}")
+
+floats = parse_numbers(["3.14", "1e3", "-.5", "inf", "N/A", "1.2.3"], kind="d")
+print(f"浮点列: {floats}, 值: {floats.values.tolist()}")
+
+# 快路径（float()）和慢路径（正则）对同一个格子的判断必须相同，不能取决于同一块里有没有坏值
+assert parse_numbers(["1.e5", "2"], "d").is_valid(0) and parse_numbers(["1.e5", "x"], "d").is_valid(0)
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试 ===")
+
+N = 300_000
+rng = random.Random(0)
+clean = [str(rng.randint(-10 ** 9, 10 ** 9)) for _ in range(N)]
+dirty = [s if rng.random() >= 0.3 else rng.choice(["N/A", "", "12a", "-"]) for s in clean]
+
+
+def per_cell(strings):
+    """原写法：逐个 try/except"""
+    return [parse_number_eafp(s) for s in strings]
+
+
+def parse_number_eafp(s):
+    try:
+        return int(s)
+    except ValueError:
+        return None
+    except TypeError:
+        return None
+
+
+for label, data in (("干净数据", clean), ("30% 坏值", dirty)):
+    start = time.perf_counter()
+    expected = per_cell(data)
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = parse_numbers(data)
+    t_new = time.perf_counter() - start
+
+    assert [v if parsed.is_valid(i) else None for i, v in enumerate(parsed.values)] == expected
+    print(f"{label}: try/except {N / t_old / 1e6:5.2f} M/秒, parse_numbers {N / t_new / 1e6:5.2f} M/秒"
+          f"（{t_old / t_new:.1f} 倍）")
+
+# 实测（3.11）：干净数据上 parse_numbers 约 0.9 倍（略慢，要多建一个 array），30% 坏值时约 1.0 倍（持平）
+# 坏值确实让逐个 try/except 慢了约 3 倍，但慢路径要先整列 strip、校验、替换坏格子再转换，省下的异常开销刚好被抵消
+# 所以批量解析在速度上并不占优；它的收益是结果紧凑（见下）、坏值不抛异常，以及可以按位图统计 / 跳过坏值
+# 结果大小：list 里每个 int 对象约 28 字节 + 8 字节指针；array('q') 每个 8 字节，位图每行 1 位
+print(f"list 结果约 {N * 36 / 1e6:.1f} MB，array + 位图约 {(len(parsed.values) * 8 + len(parsed.mask)) / 1e6:.1f} MB")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 逐个 try/except 在坏值多时明显变慢；批量先校验再转换（LBYL）在这里只做到持平，不要指望它更快")
+print("• 快路径 + 慢路径：整块合法时交给 C 一次完成，失败再逐格判断")
+print("• 用位图记录有效性：每行只占 1 位，值数组保持紧凑")
+
+print("\n=== 练习题 ===")
+print("1. 给 parse_numbers 增加 kind='f'（单精度），比较内存占用")
+print("2. 写一个 unpack_bits(mask, n)，把位图还原成 bool 列表")
+print("3. 统计一列里各种坏值出现的次数（提示：只遍历无效位）")
@@ -0,0 +1,223 @@
+"""
+Python 性能优化 - 素数引擎
+01_基础语法/03_控制流 里的 is_prime 用试除法，而且每次调用都 print，判断几百万个数会非常慢
+这里组合三种方法：小素数表（缓存）、分段筛（稠密区间）、确定性 Miller–Rabin（稀疏的 64 位大数）
+"""
+
+import functools
+import math
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# ==================== 三种方法各管一段 ====================
+# 1. 埃拉托斯特尼筛：一次性求出 [0, n) 的所有素数，适合「一整段连续的数」
+# 2. 分段筛：区间很大时按段筛，每段只占一小块内存（能放进 CPU 缓存）
+# 3. Miller–Rabin：对单个大数做概率测试；选定固定的 12 个底数后，对 < 3.18×10²³ 的数结果是确定的，
+#    完全覆盖 64 位整数
+
+
+# ==================== 小素数表 ====================
+
+
+def simple_sieve(limit):
+    """返回 bytearray，下标 i 处为 1 表示 i 是素数（0 <= i < limit）"""
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"[:limit]
+    for p in range(2, math.isqrt(limit - 1) + 1 if limit > 1 else 0):
+        if sieve[p]:
+            # 切片赋值在 C 里一次把 p*p, p*p+p, ... 全部置 0，没有 Python 循环
+            sieve[p * p::p] = bytes(len(range(p * p, limit, p)))
+    return sieve
+
+
+SMALL_LIMIT = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def small_sieve():
+    """65536 以内的筛表，只计算一次（lru_cache 缓存结果），小数直接查表"""
+    return simple_sieve(SMALL_LIMIT)
+
+
+@functools.lru_cache(maxsize=None)
+def small_primes():
+    """65536 以内的素数表，分段筛用它来划掉倍数"""
+    return array("I", (i for i, flag in enumerate(small_sieve()) if flag))
+
+
+# ==================== 分段筛 ====================
+
+
+def _sieve_segment(lo, hi):
+    """筛出 [lo, hi) 内的素数，返回 array('Q')；要求 hi <= SMALL_LIMIT²"""
+    if hi <= lo:
+        return array("Q")
+    segment = bytearray([1]) * (hi - lo)
+    for p in small_primes():
+        if p * p >= hi:
+            break
+        start = max(p * p, (lo + p - 1) // p * p)  # 区间内第一个 p 的倍数（且不小于 p²）
+        segment[start - lo::p] = bytes(len(range(start - lo, hi - lo, p)))
+    for i in range(min(2, hi) - lo if lo < 2 else 0):
+        segment[i] = 0  # 0 和 1 不是素数
+    return array("Q", (lo + i for i, flag in enumerate(segment) if flag))
+
+
+def _check_sieve_bound(hi):
+    if hi > SMALL_LIMIT ** 2:
+        raise ValueError(f"分段筛上界不能超过 {SMALL_LIMIT ** 2}，更大的数请用 is_prime / is_prime_many")
+
+
+def segmented_sieve(lo, hi, segment_size=1 << 18):
+    """逐段产出 [lo, hi) 内的素数（每次一个 array('Q')），内存只与 segment_size 有关"""
+    lo = max(lo, 0)
+    _check_sieve_bound(hi)
+    for start in range(lo, hi, segment_size):
+        yield _sieve_segment(start, min(start + segment_size, hi))
+
+
+def primes_in_range(lo, hi, segment_size=1 << 18, workers=None):
+    """
+    [lo, hi) 内的全部素数，返回 array('Q')
+    workers > 1 时把各段分给进程池并行筛，结果顺序不变
+    """
+    _check_sieve_bound(hi)
+    result = array("Q")
+    if not workers or workers <= 1:
+        for part in segmented_sieve(lo, hi, segment_size):
+            result.extend(part)
+        return result
+    starts = range(max(lo, 0), hi, segment_size)
+    ends = [min(s + segment_size, hi) for s in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_sieve_segment, starts, ends):
+            result.extend(part)
+    return result
+
+
+# ==================== Miller–Rabin ====================
+
+# 对 n < 318665857834031151167461（约 3.18×10²³）用前 12 个素数做底数即可确定性判断（覆盖全部 64 位整数）
+# 注意 3.3×10²⁴ 是再加上底数 41、共 13 个底数时的界
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _miller_rabin(n):
+    """n 为大于 37 的奇数；对 64 位整数是确定性的，更大的数是极高概率的正确结果"""
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in MR_BASES:
+        x = pow(a, d, n)  # 内置三参数 pow：模幂运算，C 实现
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False  # 找到「合数证据」
+    return True
+
+
+def is_prime(n):
+    """
+    与 01_基础语法/03_控制流 中的 is_prime 结果一致，但不再打印
+    小数查表，大数先用小素数试除、再做 Miller–Rabin
+    """
+    if n < SMALL_LIMIT:
+        return n >= 2 and small_sieve()[n] == 1
+    for p in MR_BASES:
+        if n % p == 0:
+            return False
+    return _miller_rabin(n)
+
+
+def is_prime_many(numbers, dense_ratio=4):
+    """
+    批量判断，返回与输入等长的 bool 列表
+    数字落在一段「足够稠密」的区间时（区间长度 <= 个数 × dense_ratio）用分段筛一次求出，
+    否则逐个 Miller–Rabin
+    """
+    numbers = list(numbers)
+    if not numbers:
+        return []
+    lo, hi = min(numbers), max(numbers) + 1
+    if hi - lo <= len(numbers) * dense_ratio and hi <= SMALL_LIMIT ** 2:
+        found = set(primes_in_range(lo, hi))
+        return [n in found for n in numbers]
+    return list(map(is_prime, numbers))
+
+
+# ==================== 演示与基准 ====================
+# primes_in_range(workers=...) 会启动进程池，执行代码必须放在 __main__ 判断下（见 04_模块和包/01_模块系统）
+if __name__ == "__main__":
+    print("=== 素数引擎 ===")
+
+    print(f"is_prime(17) = {is_prime(17)}, is_prime(15) = {is_prime(15)}")
+    print(f"2⁶¹-1 是素数? {is_prime(2 ** 61 - 1)}")  # 梅森素数
+    print(f"2⁶⁴-59 是素数? {is_prime(2 ** 64 - 59)}")  # 小于 2⁶⁴ 的最大素数
+    print(f"[90, 110) 的素数: {primes_in_range(90, 110).tolist()}")
+    print(f"批量判断: {is_prime_many([2, 9, 97, 10 ** 12 + 39])}")
+    for workers in (None, 2):
+        try:
+            primes_in_range(65537 ** 2 - 5, 65537 ** 2 + 5, workers=workers)
+        except ValueError as e:
+            print(f"primes_in_range(..., workers={workers}) 失败: {e}")
+
+    def is_prime_trial(n):
+        """原来的试除法，去掉 print"""
+        if n < 2:
+            return False
+        for i in range(2, int(n ** 0.5) + 1):
+            if n % i == 0:
+                return False
+        return True
+
+    print("\n=== 基准测试 ===")
+
+    # 1. 稠密区间：[0, N) 内的素数个数
+    N = 1_000_000
+    start = time.perf_counter()
+    count_old = sum(map(is_prime_trial, range(N)))
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count_new = len(primes_in_range(0, N))
+    t_new = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count_par = len(primes_in_range(0, N * 20, workers=4))
+    t_par = time.perf_counter() - start
+
+    assert count_old == count_new == 78498
+    print(f"[0, {N:,}) 试除法: {t_old:6.3f} 秒, 分段筛: {t_new:6.3f} 秒（{t_old / t_new:.0f} 倍）")
+    print(f"[0, {N * 20:,}) 分段筛 + 4 进程: {t_par:6.3f} 秒, 共 {count_par:,} 个素数")
+
+    # 2. 稀疏大数：随机 12 位数，试除法要除到 10⁶
+    rng = random.Random(1)
+    sparse = [rng.randrange(10 ** 11, 10 ** 12) | 1 for _ in range(200)]
+    start = time.perf_counter()
+    old = [is_prime_trial(n) for n in sparse]
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = is_prime_many(sparse)
+    t_new = time.perf_counter() - start
+
+    assert old == new
+    print(f"200 个 12 位奇数 试除法: {t_old:6.3f} 秒, Miller–Rabin: {t_new:6.4f} 秒（{t_old / t_new:.0f} 倍）")
+
+    # ==================== 小结与练习 ====================
+    print("\n=== 小结 ===")
+    print("• 稠密区间用筛法：bytearray 切片赋值把倍数一次置 0")
+    print("• 分段筛：每段内存固定，还可以按段分给多个进程")
+    print("• 大数用 Miller–Rabin：pow(a, d, n) 是 C 实现的模幂，12 个底数覆盖 64 位整数")
+
+    print("\n=== 练习题 ===")
+    print("1. 只筛奇数（下标 i 表示 2i+1），内存减半，改写 _sieve_segment")
+    print("2. 用 primes_in_range 求 10⁹ 附近两个相邻素数的最大间隔")
+    print("3. 修改 is_prime_many，让它对稠密部分用筛、稀疏部分用 Miller–Rabin（混合输入）")
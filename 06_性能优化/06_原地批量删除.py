@@ -0,0 +1,139 @@
+"""
+Python 性能优化 - 原地批量删除
+01_基础语法/03_控制流 里「遍历副本、边遍历边 remove」的写法：
+    for num in numbers[:]:
+        if num % 2 == 0:
+            numbers.remove(num)
+每次 remove 都要从头查找、再把后面的元素整体前移，是 O(n²)，还额外复制了一份列表
+这里用「双指针」一次遍历原地删除：保持原有顺序，不创建临时列表
+"""
+
+import time
+from array import array
+
+# ==================== 双指针原理 ====================
+print("=== 双指针 ===")
+
+# read 指针逐个读取，write 指针指向下一个「要保留的元素」该放的位置
+# 要保留的元素就复制到 write 处，write 前进；要删除的直接跳过
+# 最后把 write 之后的尾巴一次性删掉（del lst[write:read] 只做一次收缩，read 走完时就是 del lst[write:]）
+#
+#   [1, 2, 3, 4, 5]  删除偶数
+#    r w               1 保留 → lst[0] = 1
+#       r              2 删除 → 跳过
+#          r  w        3 保留 → lst[1] = 3
+#   ...
+#   [1, 3, 5, 4, 5] → del lst[3:] → [1, 3, 5]
+
+
+def delete_where(seq, predicate):
+    """
+    原地删除所有满足 predicate 的元素，保持剩余元素的相对顺序，返回删除的个数
+    seq 可以是 list、array、bytearray 等支持下标赋值和切片删除的可变序列
+    predicate 中途抛出异常时，已经判断过的元素照常删除，还没判断的原样保留，序列不会留下重复元素
+    """
+    write = read = 0
+    try:
+        for item in seq:  # 先写后读永远不会超过读指针，所以边遍历边覆盖是安全的
+            if not predicate(item):
+                seq[write] = item
+                write += 1
+            read += 1
+    finally:
+        # [write, read) 是已经读过、内容已被挪到前面（或应删除）的位置；read 之后是还没读到的原始元素
+        del seq[write:read]
+    return read - write
+
+
+def compact(seq, keep):
+    """原地只保留满足 keep 的元素（与 delete_where 相反的写法），返回 seq 本身方便链式使用"""
+    delete_where(seq, lambda item: not keep(item))
+    return seq
+
+
+def delete_where_mask(seq, mask):
+    """
+    按掩码原地删除：mask[i] 为真时删除 seq[i]
+    mask 可以是 bool 列表、bytearray、array('b') 等，长度必须与 seq 相同
+    适合掩码已经由别的批量计算（比如 04_批量数值解析 的有效位）得到的场景
+    """
+    if len(mask) != len(seq):
+        raise ValueError("mask 的长度必须与序列相同")
+    write = read = 0
+    try:
+        for item, drop in zip(seq, mask):
+            if not drop:
+                seq[write] = item
+                write += 1
+            read += 1
+    finally:
+        del seq[write:read]  # 同 delete_where：中途出错（如 mask 元素无法判断真假）也保持序列完整
+    return read - write
+
+
+numbers = [1, 2, 3, 4, 5]
+removed = delete_where(numbers, lambda n: n % 2 == 0)
+print(f"删除偶数后: {numbers}（删除了 {removed} 个）")
+
+scores = array("h", [59, 90, 45, 78, 100])
+compact(scores, lambda s: s >= 60)
+print(f"只保留及格分数: {scores.tolist()}")
+
+names = ["张三", "李四", "王五", "赵六"]
+delete_where_mask(names, [False, True, False, True])
+print(f"按掩码删除: {names}")
+
+mixed = [1, 2, 3, "x", 5]
+try:
+    delete_where(mixed, lambda n: n % 2 == 0)
+except TypeError:
+    print(f"predicate 中途出错后: {mixed}（已判断的照常删除，其余原样保留）")
+assert mixed == [1, 3, "x", 5]
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：删除一半元素 ===")
+
+
+def copy_and_remove(numbers):
+    """原写法"""
+    for num in numbers[:]:
+        if num % 2 == 0:
+            numbers.remove(num)
+
+
+def is_even(n):
+    return n % 2 == 0
+
+
+print(f"{'长度':>10} {'副本+remove':>14} {'delete_where':>14}")
+for n in (1_000, 5_000, 20_000, 40_000, 1_000_000):
+    if n <= 40_000:
+        data = list(range(n))
+        start = time.perf_counter()
+        copy_and_remove(data)
+        t_old = f"{(time.perf_counter() - start) * 1000:11.1f} ms"
+        expected = data
+    else:
+        t_old = f"{'（太慢，跳过）':>11}"
+        expected = list(range(1, n, 2))
+
+    data = list(range(n))
+    start = time.perf_counter()
+    delete_where(data, is_even)
+    t_new = (time.perf_counter() - start) * 1000
+
+    assert data == expected
+    print(f"{n:>10,} {t_old:>14} {t_new:11.1f} ms")
+
+# 长度翻 2 倍时，副本+remove 的耗时约翻 4 倍（平方级），delete_where 只翻 2 倍（线性）
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• list.remove 在循环里是 O(n²)：每次都要查找 + 移动后面的元素")
+print("• 双指针原地删除：一次遍历 O(n)，保持顺序，最后 del lst[write:] 只收缩一次")
+print("• 不在乎是否原地时，列表推导式 [x for x in lst if ...] 同样是 O(n)，而且更简单")
+
+print("\n=== 练习题 ===")
+print("1. 用 delete_where 删除字符串列表中的空字符串")
+print("2. 写一个 dedupe_inplace(lst)，原地去重并保持首次出现的顺序（提示：配合 set）")
+print("3. 比较 delete_where 与 lst[:] = [x for x in lst if ...] 的速度和峰值内存")
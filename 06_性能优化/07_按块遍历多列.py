@@ -0,0 +1,172 @@
+"""
+Python 性能优化 - 按块遍历多列
+01_基础语法/03_控制流 里用 zip(names, ages, jobs) 同时遍历多个列表，每一行都会创建一个元组
+几十列、几百万行时，光是创建元组就占了大部分时间
+这里把数据组织成「列表」（ColumnTable），按块（batch）取出每列的一段切片，聚合按块进行而不是按行
+"""
+
+import time
+from array import array
+
+# ==================== 按行 vs 按块 ====================
+print("=== 按行 vs 按块 ===")
+
+# 按行：for name, age, job in zip(names, ages, jobs) → 每行一个 3 元组，循环体每行执行一次
+# 按块：每次拿到 ages[0:65536] 这样一整段，sum() / max() 在 C 里一次处理完
+# 数值列用 array 存储，切片时用 memoryview，不复制数据（零拷贝）
+
+
+class Batch:
+    """一个块：start 是块在表中的起始行号，columns 是「列名 → 这一段切片」"""
+
+    __slots__ = ("start", "columns")
+
+    def __init__(self, start, columns):
+        self.start = start
+        self.columns = columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def rows(self):
+        """需要逐行处理时，再在块内用 zip 展开"""
+        return zip(*self.columns.values())
+
+    def __repr__(self):
+        return f"Batch(start={self.start}, rows={len(self)}, columns={list(self.columns)})"
+
+
+class ColumnTable:
+    """
+    列式表：每列是一个 array（数值列）或 list（其他列），所有列等长
+    - rows(): 与 zip(names, ages, jobs) 等价的逐行遍历
+    - iter_batches(): 按块产出每列的切片，数值列是 memoryview（不复制）
+    """
+
+    def __init__(self, **columns):
+        self._columns = {}
+        for name, values in columns.items():
+            self.add_column(name, values)
+
+    def add_column(self, name, values, typecode=None):
+        """
+        添加一列；typecode 指定时存成 array(typecode)
+        不指定时：全是 int 用 array('q')，全是 float 用 array('d')，否则用 list
+        values 也可以是生成器等只能遍历一次的对象，先转成列表再检查
+        """
+        if not isinstance(values, (array, list)):
+            values = list(values)
+        if self._columns and len(values) != len(self):
+            raise ValueError(f"列 {name!r} 长度为 {len(values)}，与表长度 {len(self)} 不一致")
+        if typecode is None and not isinstance(values, array):
+            kinds = set(map(type, values))
+            typecode = {frozenset({int}): "q", frozenset({float}): "d"}.get(frozenset(kinds))
+        if isinstance(values, array):
+            column = values
+        elif typecode:
+            column = array(typecode, values)
+        else:
+            column = list(values)
+        self._columns[name] = column
+
+    def column(self, name):
+        return self._columns[name]
+
+    @property
+    def names(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return len(next(iter(self._columns.values()), ()))
+
+    def rows(self, *names):
+        """逐行遍历（兼容写法），names 为空时遍历所有列"""
+        names = names or self.names
+        return zip(*(self._columns[n] for n in names))
+
+    def iter_batches(self, batch_size=65_536, names=None):
+        """
+        按块遍历：每次产出一个 Batch，包含 names 中每列的一段
+        数值列给出 memoryview 切片（零拷贝），list 列给出普通切片
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size 必须大于 0")
+        names = names or self.names
+        views = {}
+        for n in names:
+            col = self._columns[n]
+            views[n] = memoryview(col) if isinstance(col, array) else col
+        for start in range(0, len(self), batch_size):
+            stop = start + batch_size
+            yield Batch(start, {n: v[start:stop] for n, v in views.items()})
+
+    def __repr__(self):
+        return f"ColumnTable({len(self)} rows, columns={self.names})"
+
+
+names = ["张三", "李四", "王五"]
+ages = [28, 30, 25]
+jobs = ["iOS", "Android", "前端"]
+
+table = ColumnTable(name=names, age=ages, job=jobs)
+print(table)
+
+for name, age, job in table.rows():
+    print(f"{name}, {age}岁, {job}开发")
+
+for batch in table.iter_batches(batch_size=2):
+    print(f"{batch}: 平均年龄 {sum(batch['age']) / len(batch):.1f}")
+
+table.add_column("salary", (age * 1000 for age in ages))  # 生成器也可以
+print(f"salary 列: {table.column('salary')}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：20 列求每列总和 ===")
+
+ROWS = 200_000
+COLS = 20
+big = ColumnTable(**{f"c{j}": array("q", range(j, ROWS + j)) for j in range(COLS)})
+
+
+def totals_zip(table):
+    """原写法：zip 逐行，每行一个 20 元组"""
+    totals = [0] * COLS
+    for row in table.rows():
+        for j, v in enumerate(row):
+            totals[j] += v
+    return totals
+
+
+def totals_batched(table, batch_size):
+    """按块：每块每列一次 sum()，循环次数 = 块数 × 列数"""
+    totals = dict.fromkeys(table.names, 0)
+    for batch in table.iter_batches(batch_size):
+        for n in totals:
+            totals[n] += sum(batch[n])
+    return list(totals.values())
+
+
+start = time.perf_counter()
+expected = totals_zip(big)
+t_zip = time.perf_counter() - start
+print(f"zip 逐行:           {t_zip * 1000:8.1f} ms")
+
+for size in (1_024, 65_536):
+    start = time.perf_counter()
+    assert totals_batched(big, size) == expected
+    t_batch = time.perf_counter() - start
+    print(f"按块（{size:>6} 行）: {t_batch * 1000:8.1f} ms（{t_zip / t_batch:.0f} 倍）")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• zip 逐行遍历每行都创建元组，列多、行多时开销很大")
+print("• 按块遍历：循环次数从「行数」降到「块数 × 列数」，每块交给 sum/max 等 C 函数")
+print("• memoryview 切片不复制底层数据，块再多也不会额外占内存")
+
+print("\n=== 练习题 ===")
+print("1. 用 iter_batches 计算每列的最大值和最小值")
+print("2. 给 Batch 增加 filter(name, predicate)，返回块内满足条件的行号")
+print("3. 比较 batch_size 为 16、1024、65536 时的速度，解释为什么太小和太大都不好")
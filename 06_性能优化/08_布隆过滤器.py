@@ -0,0 +1,220 @@
+"""
+Python 性能优化 - 布隆过滤器
+01_基础语法/03_控制流 里用 for-else 在 languages 中查找 target、用 "苹果" in fruits 判断成员，都是线性扫描
+目录有几千万个键、而且大多数查询的键根本不存在时，可以在前面放一个布隆过滤器：
+「肯定不在」直接返回，只有「可能在」时才去查真正的大结构
+"""
+
+import hashlib
+import math
+import random
+import struct
+import sys
+import time
+
+# ==================== 原理 ====================
+print("=== 布隆过滤器原理 ===")
+
+# 一个 m 位的位数组 + k 个哈希函数
+# 添加：把 key 的 k 个哈希位置都置 1
+# 查询：k 个位置有任何一个是 0 → 肯定不在；全是 1 → 可能在（有一定误判率）
+# 只会「误报存在」，不会「漏报存在」，所以能安全地挡在精确结构前面
+#
+# 给定元素个数 n 和目标误判率 p：
+#   m = -n·ln(p) / (ln 2)²     k = (m / n)·ln 2
+# 例如 n = 1000 万、p = 1% 时 m ≈ 9.6 千万位 ≈ 11.4 MB，远小于存 1000 万个字符串的 set
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+    - 哈希用 blake2b 而不是内置 hash()：内置 hash 对字符串每个进程的随机种子不同，
+      不同进程建出来的过滤器就无法合并、也无法序列化后在别处使用
+    - 用「双重哈希」从一个 128 位摘要派生出 k 个位置：h1 + i·h2
+    - 键默认只能是 str / bytes；其他类型要传 encode(key) -> bytes，
+      而且相等的键必须编码成相同的字节（1 == 1.0，repr 却不同，用 repr 会漏报）
+    """
+
+    _HEADER = struct.Struct("<QQQ")  # 序列化头：位数 m、哈希个数 k、已添加个数
+
+    def __init__(self, capacity, error_rate=0.01, encode=None):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity 必须大于 0，error_rate 必须在 (0, 1) 之间")
+        m = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        k = max(1, round(m / capacity * math.log(2)))
+        self._init(m, k, bytearray((m + 7) // 8), 0, encode)
+
+    def _init(self, m, k, bits, count, encode=None):
+        self.m = m
+        self.k = k
+        self.bits = bits
+        self.count = count
+        self.encode = encode
+
+    def _digest(self, key):
+        if self.encode is not None:
+            key = self.encode(key)
+        elif isinstance(key, str):
+            key = key.encode("utf-8")
+        elif not isinstance(key, (bytes, bytearray)):
+            raise TypeError(f"键应为 str 或 bytes，实际是 {type(key).__name__}；其他类型请传 encode 参数")
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _positions(self, key):
+        h1, h2 = struct.unpack("<QQ", self._digest(key))
+        h2 |= 1  # 保证步长是奇数，避免 k 个位置退化成同一个
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key):
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] >> (pos & 7) & 1:
+                return False  # 有一位是 0：肯定不在
+        return True  # 全是 1：可能在
+
+    def __len__(self):
+        """已添加的次数（重复添加同一个键也会计数）"""
+        return self.count
+
+    @property
+    def estimated_error_rate(self):
+        """按当前元素个数估算的误判率：(1 - e^(-k·n/m))^k"""
+        return (1 - math.exp(-self.k * self.count / self.m)) ** self.k
+
+    # ---------- 序列化与合并 ----------
+    def to_bytes(self):
+        return self._HEADER.pack(self.m, self.k, self.count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data, encode=None):
+        """encode 不会被序列化，接收方要传入与发送方相同的函数"""
+        m, k, count = cls._HEADER.unpack_from(data)
+        bits = bytearray(data[cls._HEADER.size:])
+        if len(bits) != (m + 7) // 8:
+            raise ValueError("数据长度与头部记录的位数不一致")
+        bloom = cls.__new__(cls)
+        bloom._init(m, k, bits, count, encode)
+        return bloom
+
+    def __or__(self, other):
+        """合并两个过滤器（必须是相同的 m 和 k）：位数组按位或，整段在 C 里完成"""
+        if (self.m, self.k) != (other.m, other.k):
+            raise ValueError("只能合并 m 和 k 都相同的布隆过滤器")
+        size = len(self.bits)
+        merged = int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little")
+        bloom = BloomFilter.__new__(BloomFilter)
+        bloom._init(self.m, self.k, bytearray(merged.to_bytes(size, "little")), self.count + other.count,
+                    self.encode)
+        return bloom
+
+    def __repr__(self):
+        return f"BloomFilter(m={self.m}, k={self.k}, count={self.count}, {len(self.bits) / 1024:.1f} KB)"
+
+
+# ==================== 挡在精确结构前面 ====================
+
+
+class GuardedCatalog:
+    """
+    布隆过滤器 + 精确结构（list、set、数据库查询函数……）
+    过滤器说「肯定不在」时直接返回 False，只有「可能在」时才查 exact
+    键不是 str / bytes 时要传 encode，见 BloomFilter
+    """
+
+    def __init__(self, exact, error_rate=0.01, contains=None, encode=None):
+        self.exact = exact
+        self._contains = contains or exact.__contains__
+        self.bloom = BloomFilter(max(len(exact), 1), error_rate, encode)
+        self.bloom.update(exact)
+        self.exact_lookups = 0  # 统计真正查了几次大结构
+
+    def __contains__(self, key):
+        if key not in self.bloom:
+            return False
+        self.exact_lookups += 1
+        return self._contains(key)
+
+
+fruits = ["苹果", "香蕉", "橙子"]
+guarded = GuardedCatalog(fruits)
+print(f"苹果 in fruits: {'苹果' in guarded}, 葡萄 in fruits: {'葡萄' in guarded}")
+print(f"查询 2 次，真正扫描列表 {guarded.exact_lookups} 次")
+
+target = "Python"
+languages = GuardedCatalog(["Java", "Swift", "Kotlin"])
+print("找到了" if target in languages else "没有找到", target)
+
+# 数字键：1 == 1.0 == True，但 repr 各不相同；要先统一成同一种表示再编码
+ids = GuardedCatalog({1, 2, 3}, encode=lambda key: str(int(key)).encode())
+assert 1.0 in ids and 2 in ids and 4 not in ids
+try:
+    GuardedCatalog({1, 2, 3})
+except TypeError as e:
+    print(f"没有 encode: {e}")
+
+# 多个 worker 各自建过滤器，序列化后传回来合并
+part1 = BloomFilter(1000)
+part1.update(["Java", "Swift"])
+part2 = BloomFilter(1000)
+part2.add("Kotlin")
+part2 = BloomFilter.from_bytes(part2.to_bytes())  # 模拟从另一个进程收到的字节
+merged = part1 | part2
+print(f"合并后: {merged}, Kotlin? {'Kotlin' in merged}, Python? {'Python' in merged}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：大部分查询的键不存在 ===")
+
+N = 200_000
+QUERIES = 1_000
+catalog = [f"item-{i}" for i in range(N)]
+rng = random.Random(7)
+# 95% 的查询不存在，5% 存在
+queries = [f"item-{rng.randrange(N)}" if rng.random() < 0.05 else f"missing-{i}" for i in range(QUERIES)]
+
+start = time.perf_counter()
+hits_list = sum(q in catalog for q in queries)
+t_list = time.perf_counter() - start
+
+guarded = GuardedCatalog(catalog)
+start = time.perf_counter()
+hits_guarded = sum(q in guarded for q in queries)
+t_guarded = time.perf_counter() - start
+
+assert hits_list == hits_guarded
+print(f"直接扫描 list:    {t_list * 1000:8.1f} ms")
+print(f"布隆过滤器 + list: {t_guarded * 1000:8.1f} ms（{t_list / t_guarded:.0f} 倍），"
+      f"只扫描了 {guarded.exact_lookups} 次（命中 {hits_list} 次）")
+
+# 误判率实测
+false_positive = sum(f"absent-{i}" in guarded.bloom for i in range(20_000)) / 20_000
+print(f"目标误判率 1%，实测 {false_positive:.2%}，估算 {guarded.bloom.estimated_error_rate:.2%}")
+
+# 内存：过滤器 vs 把所有键放进 set
+print(f"过滤器大小 {len(guarded.bloom.bits) / 1024:.0f} KB，"
+      f"set 仅哈希表本身就约 {sys.getsizeof(set(catalog)) / 1024:.0f} KB（还不含字符串）")
+
+# 注意：如果精确结构本身就是内存里的 set，set 查询已经是 O(1) 而且比纯 Python 的过滤器更快；
+# 布隆过滤器的价值在于挡住「昂贵的」查询：线性扫描、磁盘、网络、另一个进程里的数据
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 布隆过滤器：只会误报「存在」，不会漏报，适合挡在昂贵的精确查询前面")
+print("• 大小由元素个数和误判率决定，与键本身的长度无关")
+print("• 用稳定的哈希（blake2b）才能跨进程序列化与合并")
+print("• 相等的键必须编码成相同的字节，否则会漏报；不要用 repr 代替")
+
+print("\n=== 练习题 ===")
+print("1. 把误判率分别设为 10%、1%、0.1%，观察位数组大小和 k 的变化")
+print("2. 为什么布隆过滤器不支持删除？查一查「计数布隆过滤器」是怎么解决的")
+print("3. 用 multiprocessing 让 4 个进程各自建过滤器，再在主进程里合并")
@@ -0,0 +1,188 @@
+"""
+Python 性能优化 - 增量维护 Top-K
+01_基础语法/03_控制流 的练习题「遍历一个字典，找出值最大的键」：max(d, key=d.get) 每次都要扫描整个字典
+字典每秒被更新几千次、又要随时知道最大值时，反复全量扫描非常浪费
+这里写一个 dict 子类，在 set / update / delete 时顺手维护一个堆：argmax 均摊 O(1)，top-k 为 O(k log n)
+"""
+
+import heapq
+import itertools
+import random
+import time
+
+# ==================== 堆 + 惰性删除 ====================
+print("=== 堆 + 惰性删除 ===")
+
+# heapq 是最小堆，存 (-value, 序号, key) 就能让最大值在堆顶
+# 修改 / 删除某个键时，不去堆里找旧条目（那是 O(n)），而是直接压入新条目，
+# 旧条目留在堆里成为「过期条目」；取堆顶时发现过期就弹掉 —— 这就是「惰性删除」
+# 判断是否过期：每个键记住自己最新条目的序号，序号对不上就是过期的
+# 过期条目太多时整体重建一次堆，保证堆的大小始终是 O(活跃键数)
+
+
+class TopKDict(dict):
+    """
+    能随时取出值最大的键的 dict（值需要是数字）
+    - argmax(): 值最大的键，均摊 O(1)
+    - top_k(k): 值最大的 k 个 (key, value)，O(k log n)
+    值相同时，最近一次被设置得越早的键排在越前面
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._heap = []
+        self._latest = {}  # key → 最新条目的序号
+        self._counter = itertools.count()
+        self.update(*args, **kwargs)
+
+    # ---------- 维护堆 ----------
+    def _push(self, key, value):
+        seq = next(self._counter)
+        self._latest[key] = seq
+        heapq.heappush(self._heap, (-value, seq, key))
+        if len(self._heap) > 2 * len(self) + 64:
+            self._rebuild()
+
+    def _rebuild(self):
+        """丢掉所有过期条目，O(n) 重建堆"""
+        latest = self._latest
+        self._heap = [entry for entry in self._heap if latest.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def _is_live(self, entry):
+        return self._latest.get(entry[2]) == entry[1]
+
+    def _clean_top(self):
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+
+    # ---------- 覆盖 dict 的所有修改方法 ----------
+    # dict 的 C 实现里 update / setdefault 等不会调用 __setitem__，所以都要单独覆盖
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._push(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self._latest[key]  # 堆里的旧条目自然过期
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        """d |= other：dict 的 C 实现同样不经过 __setitem__"""
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    _MISSING = object()
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default is self._MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, value = super().popitem()
+        del self._latest[key]
+        return key, value
+
+    def clear(self):
+        super().clear()
+        self._heap.clear()
+        self._latest.clear()
+
+    # ---------- 查询 ----------
+    def argmax(self):
+        """值最大的键；空字典抛出 ValueError（与 max() 一致）"""
+        self._clean_top()
+        if not self._heap:
+            raise ValueError("argmax() of empty TopKDict")
+        return self._heap[0][2]
+
+    def top_k(self, k):
+        """值最大的 k 个 (key, value)：弹出 k 个有效条目，再放回去"""
+        taken = []
+        heap = self._heap
+        while heap and len(taken) < k:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [(key, -neg) for neg, _, key in taken]
+
+
+scores = TopKDict({"张三": 85, "李四": 92, "王五": 78})
+print(f"值最大的键: {scores.argmax()}")
+
+scores["王五"] = 99
+print(f"王五改成 99 后: {scores.argmax()}")
+
+del scores["王五"]
+scores.update(赵六=95, 孙七=60)
+print(f"删除王五、加入赵六和孙七后 top 3: {scores.top_k(3)}")
+print(f"它仍然是一个 dict: {isinstance(scores, dict)}, {dict(scores)}")
+
+merged = TopKDict(a=1)
+merged |= {"b": 5}
+assert type(merged) is TopKDict and merged.argmax() == "b" and merged.top_k(2) == [("b", 5), ("a", 1)]
+print(f"|= 之后: {merged.top_k(2)}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：每次更新后取最大值 ===")
+
+N = 20_000
+UPDATES = 2_000
+rng = random.Random(3)
+keys = [f"k{i}" for i in range(N)]
+initial = {k: rng.random() for k in keys}
+changes = [(rng.choice(keys), rng.random() * 1.001) for _ in range(UPDATES)]
+
+plain = dict(initial)
+start = time.perf_counter()
+answers_plain = []
+for key, value in changes:
+    plain[key] = value
+    answers_plain.append(max(plain, key=plain.get))  # 原写法：每次全量扫描
+t_plain = time.perf_counter() - start
+
+tracked = TopKDict(initial)
+start = time.perf_counter()
+answers_tracked = []
+for key, value in changes:
+    tracked[key] = value
+    answers_tracked.append(tracked.argmax())
+t_tracked = time.perf_counter() - start
+
+assert answers_plain == answers_tracked
+print(f"max(d, key=d.get): {t_plain * 1000:8.1f} ms")
+print(f"TopKDict.argmax:   {t_tracked * 1000:8.1f} ms（{t_plain / t_tracked:.0f} 倍）")
+
+start = time.perf_counter()
+for _ in range(1_000):
+    top = tracked.top_k(10)
+t_topk = time.perf_counter() - start
+assert top == sorted(tracked.items(), key=lambda kv: kv[1], reverse=True)[:10]
+print(f"top_k(10): 每次约 {t_topk * 1000:.1f} µs（1000 次共 {t_topk * 1000:.1f} ms）")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 堆顶就是最大值；修改时压入新条目，旧条目惰性删除")
+print("• 用「键 → 最新序号」判断条目是否过期；过期太多时整体重建")
+print("• 继承 dict 时要覆盖 update、setdefault、pop 等所有修改方法，它们不会调用 __setitem__")
+
+print("\n=== 练习题 ===")
+print("1. 给 TopKDict 增加 argmin()（提示：再维护一个堆）")
+print("2. 实现一个 increment(key, delta=1)，用于计数器场景（如热门搜索词）")
+print("3. 把 _rebuild 的触发条件改成 4 倍，观察内存和速度的变化")
@@ -0,0 +1,209 @@
+"""
+Python 性能优化 - 流式归约
+01_基础语法/04_函数 里的 sum_all(*numbers) 用 *args 接收参数，调用 sum_all(*生成器) 时
+Python 会先把整个生成器展开成一个元组 —— 5000 万个数就是 5000 万个对象同时在内存里
+这里的归约函数接受任意可迭代对象 / 缓冲区（array、memoryview）/ 数字文件，按块流式处理，
+支持补偿求和（math.fsum 风格），还可以把块分给进程池
+"""
+
+import functools
+import io
+import math
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# ==================== 按块读取各种数据源 ====================
+
+
+def iter_chunks(source, chunk_size=65_536, parse=float):
+    """
+    把数据源切成块，每块是一个可以直接交给 sum/min/max 的序列
+    - array / memoryview 缓冲区：memoryview 切片，不复制数据
+    - 文本文件：每次读若干行，用 parse 转成数字（空行跳过）
+    - 其他可迭代对象（包括生成器）：每次 islice 出 chunk_size 个
+    """
+    if isinstance(source, (array, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    elif isinstance(source, io.IOBase):
+        while True:
+            lines = source.readlines(chunk_size * 16)  # 参数是「大约多少字符」
+            if not lines:
+                return
+            yield [parse(s) for s in lines if not s.isspace()]
+    else:
+        it = iter(source)
+        while chunk := list(islice(it, chunk_size)):
+            yield chunk
+
+
+# ==================== 块内归约 + 块间合并 ====================
+
+
+class _Stats:
+    """单次遍历同时得到 count / sum / min / max；sum 用 Neumaier 补偿合并各块结果"""
+
+    __slots__ = ("count", "total", "compensation", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.compensation = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add_chunk(self, count, chunk_sum, chunk_min, chunk_max):
+        self.count += count
+        # Neumaier 补偿：把「大数 + 小数」时丢掉的低位记在 compensation 里
+        t = self.total + chunk_sum
+        if isinstance(t, float):
+            if abs(self.total) >= abs(chunk_sum):
+                self.compensation += (self.total - t) + chunk_sum
+            else:
+                self.compensation += (chunk_sum - t) + self.total
+        self.total = t
+        self.minimum = chunk_min if self.minimum is None else min(self.minimum, chunk_min)
+        self.maximum = chunk_max if self.maximum is None else max(self.maximum, chunk_max)
+
+    def result(self):
+        total = self.total + self.compensation if isinstance(self.total, float) else self.total
+        return {
+            "count": self.count,
+            "sum": total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": total / self.count if self.count else None,
+        }
+
+
+def _reduce_chunk(chunk, exact):
+    """
+    一个块的 (个数, 和, 最小, 最大)
+    exact=True 时浮点块用 math.fsum（结果是正确舍入的）；整数块的 sum 本来就是精确的，结果仍是 int
+    """
+    if not len(chunk):
+        return 0, 0, None, None
+    typecode = chunk.format if isinstance(chunk, memoryview) else getattr(chunk, "typecode", None)
+    if isinstance(chunk, memoryview) and typecode == "d":
+        chunk = chunk.tolist()  # 浮点缓冲区转一次列表，sum/fsum 走更快的列表迭代
+    if exact and typecode in ("d", "f"):
+        total = math.fsum(chunk)
+    else:
+        total = sum(chunk)
+        if exact and isinstance(total, float):  # 列表里有浮点数：重新精确地求一遍
+            total = math.fsum(chunk)
+    return len(chunk), total, min(chunk), max(chunk)
+
+
+def _bounded_map(pool, func, items, max_in_flight):
+    """
+    像 pool.map，但最多只让 max_in_flight 个任务同时在路上
+    Executor.map 会一次性把所有输入都提交出去 —— 对生成器来说就等于先把它全部展开
+    """
+    pending = []
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def stream_stats(source, chunk_size=65_536, exact=False, workers=None, parse=float):
+    """
+    流式计算 count / sum / min / max / mean，内存只与 chunk_size 有关
+    exact=True：浮点块内 math.fsum，块间补偿合并，浮点求和几乎没有舍入误差；整数仍按整数精确求和
+    workers > 1：块交给进程池处理（块要序列化传给子进程，适合每块计算量大的场景）
+    """
+    stats = _Stats()
+    chunks = iter_chunks(source, chunk_size, parse)
+    if not workers or workers <= 1:
+        parts = (_reduce_chunk(c, exact) for c in chunks)
+        for count, chunk_sum, chunk_min, chunk_max in parts:
+            if count:
+                stats.add_chunk(count, chunk_sum, chunk_min, chunk_max)
+        return stats.result()
+    # memoryview 不能被 pickle，先复制成同类型的 array 再发送
+    chunks = (array(c.format, c.tobytes()) if isinstance(c, memoryview) else c for c in chunks)
+    reduce_chunk = functools.partial(_reduce_chunk, exact=exact)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for count, chunk_sum, chunk_min, chunk_max in _bounded_map(pool, reduce_chunk, chunks, workers * 2):
+            if count:
+                stats.add_chunk(count, chunk_sum, chunk_min, chunk_max)
+    return stats.result()
+
+
+def stream_sum(source, chunk_size=65_536, exact=False, workers=None, parse=float):
+    """流式求和：sum_all(*numbers) 的替代品，直接传入可迭代对象，不要加 *"""
+    return stream_stats(source, chunk_size, exact, workers, parse)["sum"]
+
+
+# ==================== 演示与基准 ====================
+# workers 参数会启动进程池，执行代码放在 __main__ 判断下（见 04_模块和包/01_模块系统）
+if __name__ == "__main__":
+    print("=== 流式归约 ===")
+
+    def sum_all(*numbers):
+        """原写法（去掉了打印）"""
+        return sum(numbers)
+
+    print(f"sum_all(1, 2, 3) = {sum_all(1, 2, 3)}, stream_sum([1, 2, 3]) = {stream_sum([1, 2, 3])}")
+    print(f"生成器: {stream_sum(x * x for x in range(10))}")
+    print(f"array: {stream_stats(array('d', [1.5, 2.5, -1.0]))}")
+    numbers_file = io.StringIO("1\n2.5\n\n3\n")  # 换成 open("numbers.txt") 效果相同
+    print(f"文件: {stream_sum(numbers_file)}")
+
+    # 补偿求和：0.1 加一百万次，普通 sum 有明显舍入误差
+    tenths = array("d", [0.1]) * 1_000_000
+    print(f"sum: {sum(tenths)!r}, stream_sum(exact=True): {stream_sum(tenths, exact=True)!r}")
+    print(f"整数不会变成浮点数: stream_sum([1, 2, 3], exact=True) = {stream_sum([1, 2, 3], exact=True)!r}")
+    assert stream_sum(iter(range(10 ** 6)), exact=True) == sum(range(10 ** 6))
+
+    print("\n=== 基准测试：对生成器求和 ===")
+
+    N = 2_000_000
+
+    def measure(func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, elapsed, peak
+
+    cases = [
+        ("sum_all(*gen)", lambda: sum_all(*(i % 1000 for i in range(N)))),
+        ("stream_sum(gen)", lambda: stream_sum(i % 1000 for i in range(N))),
+        ("stream_sum(gen, 4 进程)", lambda: stream_sum((i % 1000 for i in range(N)), workers=4)),
+    ]
+    expected = None
+    for label, func in cases:
+        result, elapsed, peak = measure(func)
+        expected = expected if expected is not None else result
+        assert result == expected
+        print(f"{label:<24} 峰值内存 {peak / 1e6:7.2f} MB, {N / elapsed / 1e6:5.2f} M 个/秒")
+
+    # 注意：计时时开着 tracemalloc，绝对速度偏慢，只看相对关系；它也只统计当前进程，子进程的内存不在其中
+    # 生成器本身的产出速度才是这里的瓶颈，多进程只有在「每块计算很重」时才划算
+
+    buffer = array("d", range(N))
+    start = time.perf_counter()
+    stream_sum(buffer)
+    print(f"array('d') 缓冲区（memoryview 切块）: {N / (time.perf_counter() - start) / 1e6:5.2f} M 个/秒")
+
+    # ==================== 小结与练习 ====================
+    print("\n=== 小结 ===")
+    print("• *args 会把生成器整个展开成元组；直接传可迭代对象才能流式处理")
+    print("• 按块归约：块内交给 sum/min/max（C 实现），块间只合并几个数")
+    print("• math.fsum + 补偿合并：大量浮点数求和时结果更准确")
+    print("• 进程池要限制在途任务数，否则 Executor.map 会先把生成器全部展开")
+
+    print("\n=== 练习题 ===")
+    print("1. 给 stream_stats 增加方差（提示：Welford 算法或按块合并 sum 与平方和）")
+    print("2. 生成一个 100 万行的数字文件，用 stream_sum(open(...)) 求和并观察内存")
+    print("3. 修改 _bounded_map，让结果按「完成顺序」而不是「提交顺序」返回，什么时候更快？")
@@ -0,0 +1,167 @@
+"""
+Python 性能优化 - 共享键的紧凑记录
+01_基础语法/04_函数 里的 build_profile / create_profile 每次调用都新建一个 dict，
+几百万个档案的键完全一样，却各自带着一张哈希表
+这里先把「键的结构（schema）」登记一次，每条记录只用 __slots__ 存值，偶尔出现的新键放进溢出 dict，
+对外仍然像 dict 一样用 profile["city"] 访问
+"""
+
+import time
+import tracemalloc
+from collections.abc import Mapping
+
+# ==================== 思路 ====================
+print("=== 共享键 ===")
+
+# dict：每个实例都有自己的「键 → 值」哈希表
+# __slots__ 类：键（属性名）只在类里存一份，每个实例只是一排固定的值槽位
+# 所以：把 schema 里的每个键映射到一个槽位，由工厂动态生成这个类
+
+_MISSING = object()  # 槽位的默认值：表示这个键没有赋值
+
+
+class CompactRecord(Mapping):
+    """
+    所有紧凑记录的基类；真正的类由 RecordFactory 按 schema 生成
+    继承 Mapping 后只需实现 __getitem__ / __iter__ / __len__，就自动拥有 keys、items、get、== 等方法
+    collections.abc 里的基类都定义了 __slots__ = ()，所以子类不会多出 __dict__
+    """
+
+    __slots__ = ("_extra",)  # 溢出 dict：schema 之外的键，平时是 None
+    _schema = ()  # 类属性：键的顺序
+    _slot_of = {}  # 类属性：键 → 槽位名
+
+    def __init__(self, values):
+        self._extra = None
+        slot_of = self._slot_of
+        for key, value in values.items():
+            slot = slot_of.get(key)
+            if slot is not None:
+                setattr(self, slot, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+
+    def __getitem__(self, key):
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            value = getattr(self, slot, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self._slot_of.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self):
+        for key in self._schema:
+            if getattr(self, self._slot_of[key], _MISSING) is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class RecordFactory:
+    """按 schema 生成一个紧凑记录类，并用它批量创建记录"""
+
+    def __init__(self, name, schema):
+        self.schema = tuple(schema)
+        slot_of = {key: f"_f{i}" for i, key in enumerate(self.schema)}  # 槽位名与键无关，任何键都能用
+        self.record_class = type(name, (CompactRecord,), {
+            "__slots__": tuple(slot_of.values()),
+            "_schema": self.schema,
+            "_slot_of": slot_of,
+        })
+
+    def __call__(self, mapping=(), **values):
+        return self.record_class({**dict(mapping), **values})
+
+
+# ==================== 兼容原来的两个函数 ====================
+
+profile_factory = RecordFactory("Profile", ["first_name", "last_name", "name", "age", "city", "job", "skill"])
+
+
+def build_profile(first_name, last_name, **user_info):
+    """与 01_基础语法/04_函数 中的 build_profile 参数相同，返回紧凑记录"""
+    return profile_factory(user_info, first_name=first_name, last_name=last_name)
+
+
+def create_profile(name, age=18, city="北京"):
+    """与 01_基础语法/04_函数 中的 create_profile 参数相同，返回紧凑记录"""
+    return profile_factory(name=name, age=age, city=city)
+
+
+user = build_profile("张", "三", age=28, city="北京", job="开发者", skill="Python", hobby="跑步")
+print(f"用户档案: {user}")
+print(f"city = {user['city']}, 溢出的键: {user._extra}")
+print(f"get 不存在的键: {user.get('email', '未填写')}")
+print(f"像 dict 一样比较: {create_profile('王五') == {'name': '王五', 'age': 18, 'city': '北京'}}")
+print(f"没有 __dict__: {not hasattr(user, '__dict__')}")
+
+# ==================== 内存对比 ====================
+print("\n=== 基准测试：20 万个档案 ===")
+
+N = 200_000
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def build_profile_dict(first_name, last_name, **user_info):
+    """原写法"""
+    profile = {"first_name": first_name, "last_name": last_name}
+    profile.update(user_info)
+    return profile
+
+
+# 所有档案共享同一组值对象（小整数、同一个字符串），测到的差异就是「容器本身」的开销
+city, job = "北京", "开发者"
+dicts, dict_bytes, dict_time = measure(
+    lambda: [build_profile_dict("张", "三", age=28, city=city, job=job) for _ in range(N)])
+compact, compact_bytes, compact_time = measure(
+    lambda: [build_profile("张", "三", age=28, city=city, job=job) for _ in range(N)])
+
+assert all(a == b for a, b in zip(dicts[:100], compact[:100]))
+print(f"dict:     {dict_bytes / N:6.1f} 字节/个, 创建 {dict_time * 1000:6.0f} ms")
+print(f"紧凑记录: {compact_bytes / N:6.1f} 字节/个, 创建 {compact_time * 1000:6.0f} ms")
+
+# 代价：紧凑记录的创建和读取要经过 Python 层的 __init__ / __getitem__，比原生 dict 慢；
+# 适合「创建一次、长期驻留、数量巨大」的数据，而不是短命的临时对象
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• dict 每个实例都有哈希表；__slots__ 让键只在类里存一份")
+print("• 用工厂按 schema 动态生成类（type(name, bases, dict)）")
+print("• 偶尔出现的新键放进溢出 dict，平时为 None 不占空间")
+print("• 继承 collections.abc.Mapping，写少量方法就能像 dict 一样使用")
+
+print("\n=== 练习题 ===")
+print("1. 给 CompactRecord 增加 __delitem__，删除键时把槽位恢复成 _MISSING")
+print("2. 用 sys.getsizeof 分别查看一个 dict 档案和一个紧凑记录的大小")
+print("3. 如果溢出 dict 里某个键在 90% 的记录里都出现了，应该怎么调整 schema？")
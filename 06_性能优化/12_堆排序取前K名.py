@@ -0,0 +1,144 @@
+"""
+Python 性能优化 - 用堆取前 K 名
+01_基础语法/04_函数 里用 sorted(students, key=lambda s: s["score"], reverse=True) 给学生排名，
+可仪表盘只展示前 100 名：对几百万条记录做完整排序是 O(n log n)，而只要前 k 个只需 O(n log k)
+"""
+
+import heapq
+import itertools
+import operator
+import random
+import time
+from array import array
+
+# ==================== 有界堆 ====================
+print("=== 有界堆 ===")
+
+# 维护一个大小为 k 的「最小堆」，堆顶是当前前 k 名里最差的那个
+# 新元素比堆顶好 → 替换堆顶（heapreplace，O(log k)）；否则直接跳过（O(1)）
+# 大多数元素都会在「和堆顶比一下」这一步被淘汰，所以 n 很大、k 很小时非常快
+
+
+def top_k_stream(iterable, k, key=None):
+    """
+    流式取前 k 名：逐个消费可迭代对象，内存只占 k 个元素
+    结果从大到小排列；分数相同时先出现的排在前面（与 sorted(..., reverse=True) 一致）
+    """
+    if k <= 0:
+        return []
+    key = _as_key(key)
+    heap = []  # 元素是 (键, -序号, 原始记录)：键相同时序号小（先出现）的更「大」
+    for index, item in enumerate(iterable):
+        entry = (key(item), -index, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(key=lambda e: e[:2], reverse=True)
+    return [item for _, _, item in heap]
+
+
+def _as_key(key):
+    """key 可以是函数、字段名（用 C 实现的 itemgetter 代替 lambda），或 None（元素本身）"""
+    if key is None:
+        return lambda x: x
+    if isinstance(key, str):
+        return operator.itemgetter(key)
+    return key
+
+
+# ==================== 标准库：heapq.nlargest ====================
+
+
+def top_k(records, k, key=None):
+    """
+    取前 k 名（推荐）：heapq.nlargest 用 C 实现了同样的有界堆，也能直接吃迭代器
+    文档保证结果等价于 sorted(records, key=key, reverse=True)[:k]，包括相同分数的先后顺序
+    """
+    return heapq.nlargest(k, records, key=_as_key(key) if key is not None else None)
+
+
+def top_k_column(column, k):
+    """
+    「预先取出的键列」：分数已经单独存在 array / list 里（比如 01_列式学生表 的 score 列）
+    返回前 k 名的行号，不需要任何记录对象，也没有 dict 查找：
+    1. heapq.nlargest(k, column) 不带 key，直接比较数字，求出第 k 名的分数（门槛）
+    2. compress + map(operator.ge) 在 C 里筛出所有「分数 >= 门槛」的行号
+    3. 候选只比 k 略多（并列的情况），用 column.__getitem__ 作 key 按分数从高到低排序；
+       sorted 是稳定的（reverse=True 也一样），同分时行号小的在前
+    第 2 步要把整列再扫一遍，所以它并不比 top_k(itemgetter) 快；适合数据本来就是按列存储、没有现成记录的场景
+    """
+    if k <= 0 or not len(column):
+        return []
+    threshold = heapq.nlargest(k, column)[-1]
+    candidates = itertools.compress(range(len(column)), map(operator.ge, column, itertools.repeat(threshold)))
+    return sorted(candidates, key=column.__getitem__, reverse=True)[:k]
+
+
+students = [
+    {"name": "张三", "score": 85},
+    {"name": "李四", "score": 92},
+    {"name": "王五", "score": 78},
+    {"name": "赵六", "score": 92},
+]
+print("前 2 名（流式有界堆）:")
+for s in top_k_stream(students, 2, key="score"):
+    print(f"  {s['name']}: {s['score']}")
+
+print(f"前 2 名（heapq.nlargest）: {[s['name'] for s in top_k(students, 2, key='score')]}")
+
+scores = array("h", (s["score"] for s in students))
+print(f"按分数列取前 2 名的行号: {top_k_column(scores, 2)}")
+
+# 迭代器也可以：不需要先把数据全部放进列表
+lazy = ({"name": f"学生{i}", "score": i % 97} for i in range(1000))
+print(f"从生成器取前 3 名: {[s['score'] for s in top_k(lazy, 3, key='score')]}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：50 万名学生取前 100 ===")
+
+N = 500_000
+K = 100
+rng = random.Random(5)
+big = [{"name": f"学生{i}", "score": rng.randint(0, 100_000)} for i in range(N)]
+score_column = array("l", map(operator.itemgetter("score"), big))
+
+
+def by_lambda(s):
+    """原写法里的 lambda s: s["score"]"""
+    return s["score"]
+
+
+expected = sorted(big, key=by_lambda, reverse=True)[:K]
+
+cases = [
+    ("sorted(lambda)[:k]", lambda: sorted(big, key=by_lambda, reverse=True)[:K]),
+    ("top_k_stream", lambda: top_k_stream(big, K, key="score")),
+    ("nlargest(lambda)", lambda: heapq.nlargest(K, big, key=by_lambda)),
+    ("top_k(itemgetter)", lambda: top_k(big, K, key="score")),
+    ("top_k_column", lambda: [big[i] for i in top_k_column(score_column, K)]),
+]
+baseline = None
+for label, run in cases:
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    baseline = baseline or elapsed
+    assert result == expected
+    print(f"{label:<20} {elapsed * 1000:7.1f} ms（{baseline / elapsed:4.1f} 倍）")
+
+# top_k_stream 是纯 Python 循环，用于讲清原理；实际使用 heapq.nlargest（C 实现）即可
+# top_k_column 比 top_k(itemgetter) 慢：求门槛一遍、筛候选又要整列扫一遍（约占一半时间）；
+# 它的价值是不需要 dict 记录，数据本来就按列存储时省下了构造记录的时间和内存
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 只要前 k 名时用大小为 k 的最小堆：O(n log k)，内存 O(k)")
+print("• heapq.nlargest / nsmallest 就是现成的有界堆，还能直接处理迭代器")
+print("• operator.itemgetter('score') 是 C 实现，比 lambda s: s['score'] 快")
+print("• 键已经单独成列时，先不带 key 求出门槛分数，再在 C 里筛出候选行号")
+
+print("\n=== 练习题 ===")
+print("1. 用 heapq.nsmallest 找出分数最低的 10 名学生")
+print("2. 修改 top_k_stream，让它同时返回每个人的名次（分数相同名次相同）")
+print("3. k 分别取 10、1000、10 万时，比较 nlargest 与 sorted 的速度，k 多大时 sorted 反而更快？")
@@ -0,0 +1,249 @@
+"""
+Python 性能优化 - 外部归并排序
+01_基础语法/04_函数 的 sorted(students, key=...) 和 01_基础语法/02_集合类型 的 numbers_copy.sort()
+都要求数据能一次放进内存；每晚的排名任务数据比内存大得多时，就需要「外部排序」：
+1. 每次读入内存放得下的一批，排好序后写到临时文件（称为一个「顺串」run）
+2. 用 heapq.merge 同时读所有顺串，做 k 路归并，边读边输出
+"""
+
+import heapq
+import itertools
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+# ==================== 顺串的读写 ====================
+# 任意记录：用 pickle 逐条写入同一个文件（二进制、比文本紧凑），读的时候逐条 load，直到 EOFError
+# 纯数字：用 array.tofile 直接写原始字节，每个数固定 8 字节，读回时按块 fromfile
+
+
+def _write_records(path, records):
+    with open(path, "wb") as f:
+        pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+        for record in records:
+            pickler.dump(record)
+            pickler.clear_memo()  # 不让 pickler 为了去重记住所有写过的对象，内存保持恒定
+
+
+def _read_records(path):
+    with open(path, "rb") as f:
+        unpickler = pickle.Unpickler(f)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+
+def _write_numbers(path, numbers, typecode, block=65_536):
+    """按块写：多轮归并时 numbers 是 heapq.merge 的输出，不能先整个变成一个 array 放在内存里"""
+    it = iter(numbers)
+    with open(path, "wb") as f:
+        while buf := array(typecode, itertools.islice(it, block)):
+            buf.tofile(f)
+
+
+def _read_numbers(path, typecode, block=65_536):
+    with open(path, "rb") as f:
+        while True:
+            buf = array(typecode)
+            try:
+                buf.fromfile(f, block)
+            except EOFError:  # 最后一块不满 block 个：已读到的数据仍保留在 buf 里
+                pass
+            if not buf:
+                return
+            yield from buf
+
+
+# ==================== 通用外部排序 ====================
+
+
+def run_size_for_budget(sample, memory_budget):
+    """
+    根据内存预算估算每个顺串放多少条记录
+    用样本的 pickle 大小估计单条记录体积；内存里的 Python 对象通常是 pickle 大小的 3 倍左右
+    """
+    sample = list(sample)
+    if not sample:
+        return 1
+    per_item = sum(len(pickle.dumps(x)) for x in sample) / len(sample) * 3
+    return max(1, int(memory_budget / per_item))
+
+
+SAMPLE_SIZE = 1000  # 按内存预算估算 run_size 时取样的条数
+
+
+def external_sort(iterable, key=None, reverse=False, run_size=100_000, max_fan_in=64, tmpdir=None,
+                  write=_write_records, read=_read_records, memory_budget=None):
+    """
+    外部归并排序，返回一个按顺序产出结果的生成器（结果本身也不会一次性放进内存）
+    - key / reverse：与 sorted() 相同；排序是稳定的（相等元素保持输入顺序）
+    - run_size：每个顺串最多多少条，决定内存上限
+    - memory_budget：给出字节数时，用前 SAMPLE_SIZE 条估算 run_size（见 run_size_for_budget），忽略 run_size
+    - max_fan_in：一次最多同时打开多少个顺串文件，顺串太多时分多轮归并
+      归并时每个打开的顺串还各有一小块读缓冲，不计入 memory_budget
+    """
+    # 参数在调用时就检查；真正的排序放在生成器里，第一次取值时才开始
+    if max_fan_in < 2:
+        raise ValueError(f"max_fan_in 至少为 2，实际是 {max_fan_in}（每轮合并不能减少顺串个数）")
+    if memory_budget is None and run_size < 1:
+        raise ValueError(f"run_size 至少为 1，实际是 {run_size}")
+    return _external_sort(iterable, key, reverse, run_size, max_fan_in, tmpdir, write, read, memory_budget)
+
+
+def _external_sort(iterable, key, reverse, run_size, max_fan_in, tmpdir, write, read, memory_budget):
+    if memory_budget is not None:
+        it = iter(iterable)
+        head = list(itertools.islice(it, SAMPLE_SIZE))
+        run_size = run_size_for_budget(head, memory_budget)
+        iterable = itertools.chain(head, it)
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        counter = itertools.count()
+
+        def new_path():
+            return os.path.join(workdir, f"run{next(counter)}.bin")
+
+        # 第一步：切成顺串。sorted 是稳定的，顺串按输入顺序编号
+        runs = []
+        it = iter(iterable)
+        while batch := list(itertools.islice(it, run_size)):
+            batch.sort(key=key, reverse=reverse)
+            path = new_path()
+            write(path, batch)
+            runs.append(path)
+            del batch  # 写完立刻释放，下一批再读入
+
+        # 第二步：顺串太多时，每 max_fan_in 个合并成一个更大的顺串，直到一轮能合并完
+        # 相邻的顺串按顺序合并，heapq.merge 对相等元素优先取前面的输入，所以整体仍然稳定
+        while len(runs) > max_fan_in:
+            merged = []
+            for i in range(0, len(runs), max_fan_in):
+                group = runs[i:i + max_fan_in]
+                path = new_path()
+                write(path, heapq.merge(*map(read, group), key=key, reverse=reverse))
+                for old in group:
+                    os.remove(old)
+                merged.append(path)
+            runs = merged
+
+        # 第三步：最终的 k 路归并，边读边产出
+        yield from heapq.merge(*map(read, runs), key=key, reverse=reverse)
+
+
+# 排序时一批数字放在 list 里：每个 8 字节的指针 + 一个 int / float 对象（64 位以内的 int 是 32 字节）
+_NUMBER_BYTES = 8 + sys.getsizeof(2 ** 62)
+
+
+def external_sort_numbers(iterable, typecode="q", reverse=False, run_size=1_000_000, tmpdir=None,
+                          memory_budget=None):
+    """
+    纯数字的外部排序：顺串用 array 的原始字节存储，比 pickle 更紧凑也更快
+    memory_budget：给出字节数时按每个数 _NUMBER_BYTES 字节换算 run_size
+    """
+    if memory_budget is not None:
+        run_size = max(1, memory_budget // _NUMBER_BYTES)
+    return external_sort(
+        iterable, reverse=reverse, run_size=run_size, tmpdir=tmpdir,
+        write=lambda path, nums: _write_numbers(path, nums, typecode),
+        read=lambda path: _read_numbers(path, typecode),
+    )
+
+
+# ==================== 演示 ====================
+print("=== 外部归并排序 ===")
+
+students = [
+    {"name": "张三", "score": 85},
+    {"name": "李四", "score": 92},
+    {"name": "王五", "score": 78},
+    {"name": "赵六", "score": 92},
+    {"name": "孙七", "score": 60},
+]
+# run_size=2 故意让每个顺串只有 2 条，演示多个顺串的归并
+ranked = external_sort(students, key=lambda s: s["score"], reverse=True, run_size=2, max_fan_in=2)
+print("按分数排序（李四、赵六同分，保持原顺序）:")
+for student in ranked:
+    print(f"  {student['name']}: {student['score']}")
+try:
+    external_sort(students, max_fan_in=1)  # 不检查的话，第二步的多轮归并永远合并不完
+except ValueError as e:
+    print(f"参数错误: {e}")
+
+numbers_copy = [3, 1, 4, 1, 5, 9, 2, 6]
+print(f"数字外部排序: {list(external_sort_numbers(numbers_copy, run_size=3))}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：内存预算只有数据量的 1/10 ===")
+
+N = 1_000_000
+rng = random.Random(11)
+
+
+def numbers():
+    """每次调用重新生成同一组数据，模拟从磁盘 / 网络流式读入"""
+    rng.seed(11)
+    return (rng.randrange(10 ** 12) for _ in range(N))
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def checksum(sorted_iter):
+    """边消费边校验有序，不把结果存下来"""
+    prev, count, total = None, 0, 0
+    for x in sorted_iter:
+        assert prev is None or prev <= x
+        prev, count, total = x, count + 1, total + x
+    return count, total
+
+
+expected, t_mem, peak_mem = measure(lambda: checksum(sorted(numbers())))
+budget = N * _NUMBER_BYTES // 10
+result, t_ext, peak_ext = measure(lambda: checksum(external_sort_numbers(numbers(), memory_budget=budget)))
+assert result == expected
+
+print(f"sorted() 全部放进内存:      {t_mem:6.2f} 秒, 峰值内存 {peak_mem / 1e6:6.1f} MB")
+print(f"external_sort_numbers(1/10): {t_ext:6.2f} 秒, 峰值内存 {peak_ext / 1e6:6.1f} MB")
+
+sample = [{"name": f"学生{i}", "score": i % 100} for i in range(1000)]
+print(f"记录排序：64 MB 预算下每个顺串约 {run_size_for_budget(sample, 64 * 2 ** 20):,} 条")
+by_score = external_sort(sample, key=lambda s: s["score"], memory_budget=16 * 2 ** 10)  # 约 100 条一个顺串
+assert list(by_score) == sorted(sample, key=lambda s: s["score"])
+
+# 多轮归并：中间顺串也是按块写出的，峰值内存只取决于 run_size 和读写块大小，不随合并后顺串的长度增长
+SMALL = N // 10
+subset = list(itertools.islice(numbers(), SMALL))
+many_runs, _, peak_multi = measure(lambda: checksum(
+    external_sort(subset, run_size=SMALL // 100, max_fan_in=4,
+                  write=lambda path, nums: _write_numbers(path, nums, "q"),
+                  read=lambda path: _read_numbers(path, "q"))))
+assert many_runs == (SMALL, sum(subset))
+print(f"{SMALL:,} 个数、100 个顺串、每轮最多合并 4 个: 峰值内存 {peak_multi / 1e6:.1f} MB（不含输入列表）")
+
+# 外部排序用磁盘换内存：总耗时更长，但峰值内存只取决于 run_size，而不是数据总量
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 外部排序 = 分批排序写顺串 + heapq.merge k 路归并")
+print("• 顺串用二进制格式：数字用 array.tofile，任意记录用 pickle 逐条写")
+print("• 顺串太多时分多轮归并，限制同时打开的文件数")
+print("• sorted 与 heapq.merge 都是稳定的，所以整个外部排序也稳定")
+
+print("\n=== 练习题 ===")
+print("1. 用 external_sort 给 100 万条学生记录按 (班级, -分数) 排序")
+print("2. 把顺串文件用 gzip.open 压缩，比较磁盘占用和耗时")
+print("3. 结合 12_堆排序取前K名：如果只要前 100 名，还需要外部排序吗？")
@@ -0,0 +1,228 @@
+"""
+Python 性能优化 - 低开销的性能统计装饰器
+01_基础语法/04_函数 里的 timer_decorator 用 time.time() 计时，每次调用都 print 一行：
+time.time() 精度低、会被系统校时影响，print 本身比很多被测函数还慢，热点函数里还会刷屏
+这里的装饰器用 perf_counter_ns 计时，只把耗时记进全局的直方图，需要时再输出 p50/p95/p99 报告或 JSON
+"""
+
+import functools
+import json
+import time
+
+# ==================== 对数直方图 ====================
+
+# 保存每一次的耗时会让内存无限增长；这里把耗时（纳秒）放进「对数分桶」：
+# 先按二进制位数（bit_length）分大桶，每个大桶再按接下来的 4 位分成 16 个小桶
+# 桶数固定（64 × 16），记录一次只是几次整数运算；估算的百分位相对误差不超过 1/16 ≈ 6%
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+
+
+def _bucket_of(ns):
+    bits = ns.bit_length()
+    if bits <= SUB_BITS:
+        return ns  # 很小的值每个值一个桶
+    shift = bits - SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (ns >> shift) - SUB_BUCKETS  # ns >> shift 落在 [16, 32)
+
+
+def _bucket_low(index):
+    """桶的下界（纳秒），用于从桶反推百分位"""
+    if index < SUB_BUCKETS * 2:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+
+
+class Histogram:
+    """一个函数的耗时统计：次数、总耗时、最小 / 最大值和对数分桶"""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * (64 * SUB_BUCKETS)
+
+    def record(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[_bucket_of(ns)] += 1
+
+    def percentile(self, p):
+        """第 p 百分位（0~100）的估计值，返回所在桶的下界，并限制在 [min, max] 之内"""
+        if not self.count:
+            return None
+        rank = max(1, round(self.count * p / 100))
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(max(_bucket_low(index), self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else None,
+            "min_us": self.min_ns / 1e3 if self.count else None,
+            "p50_us": self.percentile(50) / 1e3 if self.count else None,
+            "p95_us": self.percentile(95) / 1e3 if self.count else None,
+            "p99_us": self.percentile(99) / 1e3 if self.count else None,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+# ==================== 全局注册表与装饰器 ====================
+
+
+class Profiler:
+    """
+    全局注册表：函数名 → Histogram
+    - enabled=False 时，被装饰的函数只多一次属性判断，不计时也不记录
+    - 装饰时就处于关闭状态、且 keep_when_disabled=False 时，直接返回原函数，开销为 0
+    多个线程同时调用同一个函数时，计数可能偶尔少记（+= 不是原子操作），对统计用途可以接受
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+
+    def profile(self, func=None, *, name=None, keep_when_disabled=True):
+        """用法：@profiler.profile 或 @profiler.profile(name="...")"""
+        if func is None:
+            return functools.partial(self.profile, name=name, keep_when_disabled=keep_when_disabled)
+        if not self.enabled and not keep_when_disabled:
+            return func
+
+        histogram = self.histograms.setdefault(name or func.__qualname__, Histogram())
+        record = histogram.record
+        clock = time.perf_counter_ns
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(clock() - start)  # 抛出异常的调用也计入
+
+        return wrapper
+
+    def reset(self):
+        """原地清空：包装函数里保存着各自 Histogram 的 record 方法，不能换成新对象"""
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def snapshot(self):
+        """当前所有函数的统计，dict 格式"""
+        return {name: h.summary() for name, h in self.histograms.items() if h.count}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), ensure_ascii=False, **kwargs)
+
+    def report(self):
+        """按总耗时从高到低排列的文本报告"""
+        rows = sorted(self.snapshot().items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+        lines = [f"{'函数':<20}{'次数':>10}{'总耗时ms':>12}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}"]
+        for name, s in rows:
+            lines.append(f"{name:<20}{s['count']:>12}{s['total_ms']:>14.2f}"
+                         f"{s['p50_us']:>10.2f}{s['p95_us']:>10.2f}{s['p99_us']:>10.2f}")
+        return "\n".join(lines)
+
+
+profiler = Profiler()  # 默认的全局注册表
+profile = profiler.profile
+
+
+# ==================== 使用 ====================
+print("=== 性能统计报告 ===")
+
+
+@profile
+def slow_function():
+    """与 01_基础语法/04_函数 中的例子相同，只是睡眠时间短一些"""
+    time.sleep(0.001)
+    return "完成"
+
+
+@profile(name="fib")
+def fibonacci(n):
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+for _ in range(20):
+    slow_function()
+fibonacci(15)  # 递归调用每一层都会被记录
+print(profiler.report())
+print(f"\nJSON 快照: {profiler.to_json()[:120]}...")
+
+# ==================== 基准测试：每次调用的额外开销 ====================
+print("\n=== 基准测试：每次调用的额外开销 ===")
+
+N = 300_000
+
+
+def timer_decorator(func):
+    """原写法，为了公平去掉了 print（print 本身要几微秒，还会刷屏）"""
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        result = func(*args, **kwargs)
+        end = time.time()
+        _ = f"{func.__name__} 执行时间: {end - start:.4f}秒"
+        return result
+    return wrapper
+
+
+def add(a, b):
+    return a + b
+
+
+bench = Profiler()
+cases = [
+    ("不装饰", add),
+    ("timer_decorator(无 print)", timer_decorator(add)),
+    ("profile（开启）", bench.profile(add)),
+]
+off = Profiler(enabled=False)
+cases += [
+    ("profile（运行时关闭）", off.profile(add)),
+    ("profile（装饰时关闭）", off.profile(add, keep_when_disabled=False)),
+]
+
+bare = None
+for label, func in cases:
+    start = time.perf_counter_ns()
+    for i in range(N):
+        func(i, 1)
+    per_call = (time.perf_counter_ns() - start) / N
+    bare = bare or per_call
+    print(f"{label:<24} {per_call:7.1f} ns/次（额外 {per_call - bare:6.1f} ns）")
+
+assert bench.histograms["add"].count == N
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 计时用 time.perf_counter_ns：单调、高精度，没有浮点误差")
+print("• 热点路径里不要 print，只记录；需要时再汇总成报告")
+print("• 对数分桶的直方图内存固定，仍能估算 p50/p95/p99")
+print("• 关闭后只剩一次判断；装饰时就关闭则直接返回原函数")
+
+print("\n=== 练习题 ===")
+print("1. 给 Profiler 增加 merge(other)，把多个进程的快照合并到一起")
+print("2. 用 with 语句实现一个 profiler.section('名字')，统计任意代码块的耗时")
+print("3. 把 SUB_BITS 改成 6，百分位的精度和内存会怎样变化？")
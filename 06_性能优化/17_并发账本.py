@@ -0,0 +1,261 @@
+"""
+Python 性能优化 - 线程安全的高吞吐账本
+02_面向对象/01_类和对象 的 BankAccount.deposit / withdraw 直接修改 __balance，没有任何同步，
+每次操作还要 print：多个工作线程同时调用时余额会算错，print 也会成为瓶颈
+这里把大量账户放进一个账本：
+1. 分段锁（striped locks）：账户按编号分到固定数量的锁上，既不用一把全局锁，也不用每个账户一把锁
+2. 转账时按固定顺序加锁，两个方向相反的转账也不会死锁
+3. apply_transactions 批量执行：一批交易只加一次锁
+"""
+
+import random
+import threading
+import time
+
+# ==================== 为什么需要锁 ====================
+print("=== 为什么需要锁 ===")
+
+
+class UnsafeAccount:
+    """和 BankAccount 一样直接修改余额（去掉了 print）"""
+
+    def __init__(self, balance=0):
+        self.balance = balance
+
+    def deposit(self, amount):
+        balance = self.balance  # 读
+        time.sleep(0)  # 读和写之间做了别的事（这里只是让出 CPU），其他线程趁机修改了余额
+        self.balance = balance + amount  # 写：覆盖掉别人的修改
+
+
+def hammer(account, times):
+    for _ in range(times):
+        account.deposit(1)
+
+
+unsafe = UnsafeAccount()
+threads = [threading.Thread(target=hammer, args=(unsafe, 5_000)) for _ in range(4)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(f"4 个线程各存 5000 次 1 元，应为 20000，实际: {unsafe.balance}")
+
+# ==================== 账本 ====================
+print("\n=== 分段锁账本 ===")
+
+
+class InsufficientFunds(ValueError):
+    """余额不足；原来的 BankAccount 只 print 一句，这里改为抛出异常，调用方可以处理"""
+
+
+class Ledger:
+    """
+    多账户账本，金额用整数（分）表示，避免浮点误差
+    stripes 把账户分到若干把锁上：账户 i 用第 hash(i) % stripes 把锁
+    """
+
+    def __init__(self, stripes=64):
+        self._balances = {}
+        self._owners = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _stripe(self, account_id):
+        return hash(account_id) % len(self._locks)
+
+    def _locks_for(self, account_ids):
+        """需要的锁按编号排序、去重：所有线程都按同样的顺序加锁，就不会互相等待形成环"""
+        return [self._locks[i] for i in sorted({self._stripe(a) for a in account_ids})]
+
+    @staticmethod
+    def _acquire(locks):
+        for lock in locks:
+            lock.acquire()
+
+    @staticmethod
+    def _release(locks):
+        for lock in reversed(locks):
+            lock.release()
+
+    # ---------- 账户 ----------
+    def open(self, account_id, owner, balance=0):
+        # 开户会往字典里插入新键：持有这个账户所在分段的锁，total() 遍历期间字典就不会变
+        with self._locks[self._stripe(account_id)]:
+            if account_id in self._balances:
+                raise ValueError(f"账户已存在: {account_id}")
+            self._owners[account_id] = owner
+            self._balances[account_id] = balance
+
+    def get_balance(self, account_id):
+        return self._balances[account_id]  # 读一个 int 是原子的
+
+    def total(self):
+        """所有账户的余额之和：要拿到全部锁，才能得到一个一致的快照"""
+        self._acquire(self._locks)  # 列表本身就是按编号排好的
+        try:
+            return sum(self._balances.values())
+        finally:
+            self._release(self._locks)
+
+    # ---------- 不加锁的内部操作：调用方必须已经持有相关的锁 ----------
+    def _apply(self, kind, account_id, amount, target=None):
+        if amount <= 0:
+            raise ValueError("金额必须大于0")
+        balances = self._balances
+        if kind == "deposit":
+            balances[account_id] += amount
+        elif kind in ("withdraw", "transfer"):
+            if balances[account_id] < amount:
+                raise InsufficientFunds(f"{account_id} 余额不足: {balances[account_id]} < {amount}")
+            if kind == "transfer":
+                balances[target]  # 先确认收款账户存在，再扣款
+            balances[account_id] -= amount
+            if kind == "transfer":
+                balances[target] += amount
+        else:
+            raise ValueError(f"未知的交易类型: {kind}")
+
+    # ---------- 单笔操作 ----------
+    def deposit(self, account_id, amount):
+        with self._locks[self._stripe(account_id)]:
+            self._apply("deposit", account_id, amount)
+
+    def withdraw(self, account_id, amount):
+        with self._locks[self._stripe(account_id)]:
+            self._apply("withdraw", account_id, amount)
+
+    def transfer(self, source, target, amount):
+        """原子转账：同时持有两个账户的锁，要么都改，要么都不改"""
+        locks = self._locks_for((source, target))
+        self._acquire(locks)
+        try:
+            self._apply("transfer", source, amount, target)
+        finally:
+            self._release(locks)
+
+    # ---------- 批量操作 ----------
+    def apply_transactions(self, transactions):
+        """
+        批量执行交易：("deposit", 账户, 金额) / ("withdraw", 账户, 金额) / ("transfer", 转出, 转入, 金额)
+        一次性按顺序拿到这批交易涉及的全部锁，逐笔执行后再一起释放，加锁次数从每笔一次降到每批一次
+        某一笔失败不影响其他笔；返回失败的 [(序号, 异常), ...]
+        """
+        transactions = list(transactions)  # 要遍历两遍：先收集账户，再逐笔执行
+        involved = set()
+        for tx in transactions:
+            involved.add(tx[1])
+            if tx[0] == "transfer":
+                involved.add(tx[2])
+        locks = self._locks_for(involved)
+        failures = []
+        self._acquire(locks)
+        try:
+            for index, tx in enumerate(transactions):
+                try:
+                    if tx[0] == "transfer":
+                        self._apply("transfer", tx[1], tx[3], tx[2])
+                    else:
+                        self._apply(tx[0], tx[1], tx[2])
+                except (ValueError, KeyError) as e:
+                    failures.append((index, e))
+        finally:
+            self._release(locks)
+        return failures
+
+
+ledger = Ledger()
+ledger.open("A001", "张三", 1000)
+ledger.open("A002", "李四", 500)
+ledger.deposit("A001", 500)
+ledger.transfer("A001", "A002", 300)
+print(f"张三: {ledger.get_balance('A001')}, 李四: {ledger.get_balance('A002')}")
+try:
+    ledger.withdraw("A002", 10_000)
+except InsufficientFunds as e:
+    print(f"取款失败: {e}")
+
+failures = ledger.apply_transactions([
+    ("deposit", "A002", 100),
+    ("transfer", "A002", "A001", 50),
+    ("withdraw", "A001", 99_999),
+    ("deposit", "A999", 1),
+])
+print(f"批量执行，失败的交易: {[(i, type(e).__name__) for i, e in failures]}")
+print(f"张三: {ledger.get_balance('A001')}, 李四: {ledger.get_balance('A002')}")
+assert not ledger.apply_transactions(("deposit", a, 1) for a in ("A001", "A002"))  # 生成器也可以
+assert ledger.total() == 2102
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：8 个线程随机转账 ===")
+
+ACCOUNTS = 1_000
+THREADS = 8
+PER_THREAD = 20_000
+BATCH = 100
+INITIAL = 1_000_000  # 余额足够大，保证没有失败，最终结果与执行顺序无关
+
+rng = random.Random(17)
+work = [
+    [(rng.randrange(ACCOUNTS), rng.randrange(ACCOUNTS), rng.randint(1, 100)) for _ in range(PER_THREAD)]
+    for _ in range(THREADS)
+]
+
+# 期望的最终余额：单线程顺序执行一遍
+expected = [INITIAL] * ACCOUNTS
+for transfers in work:
+    for src, dst, amount in transfers:
+        expected[src] -= amount
+        expected[dst] += amount
+
+
+def new_ledger(stripes):
+    book = Ledger(stripes)
+    for i in range(ACCOUNTS):
+        book.open(i, f"用户{i}", INITIAL)
+    return book
+
+
+def run_single(book, transfers):
+    for src, dst, amount in transfers:
+        book.transfer(src, dst, amount)
+
+
+def run_batched(book, transfers):
+    for start in range(0, len(transfers), BATCH):
+        batch = [("transfer", src, dst, amount) for src, dst, amount in transfers[start:start + BATCH]]
+        assert not book.apply_transactions(batch)
+
+
+def benchmark(label, stripes, worker):
+    book = new_ledger(stripes)
+    threads = [threading.Thread(target=worker, args=(book, transfers)) for transfers in work]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert [book.get_balance(i) for i in range(ACCOUNTS)] == expected
+    assert book.total() == INITIAL * ACCOUNTS
+    print(f"{label:<22} {THREADS * PER_THREAD / elapsed / 1e3:7.0f} 千笔/秒（余额核对通过）")
+
+
+benchmark("一把全局锁", 1, run_single)
+benchmark("64 段锁", 64, run_single)
+benchmark("64 段锁 + 批量", 64, run_batched)
+
+# CPython 有 GIL，同一时刻只有一个线程在执行字节码，所以分段锁在这里主要是「不出错」而不是「更快」；
+# 当交易里还有 I/O（如 18_预写日志 里的写盘）时，分段锁才能让不相关的账户真正并行
+# 批量接口减少了加锁 / 解锁和函数调用的次数，是单线程里也能看到的收益
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 「读-改-写」不是原子操作，多线程修改共享数据必须加锁")
+print("• 分段锁：固定数量的锁，在全局锁和每账户一把锁之间折中")
+print("• 需要多把锁时按统一顺序获取，避免死锁")
+print("• 批量接口把加锁的开销分摊到一批交易上")
+
+print("\n=== 练习题 ===")
+print("1. 让 apply_transactions 支持 atomic=True：任何一笔失败就撤销整批")
+print("2. 故意让转账按「先转出方、再转入方」的顺序加锁，写一个会死锁的例子")
+print("3. 把 stripes 改成 1、8、1024，对比吞吐量，解释结果")
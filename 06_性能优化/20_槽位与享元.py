@@ -0,0 +1,208 @@
+"""
+Python 性能优化 - __slots__ 与享元（Flyweight）
+02_面向对象/01_类和对象 的 Animal / Cat / Dog 把 name、species、color / breed 放在每个实例的 __dict__ 里，
+每只猫的 species 都是「猫」：数据从文件 / 网络读进来时，每个实例还会各自持有一个内容相同的字符串
+这里：
+1. 整个继承体系都用 __slots__，实例没有 __dict__
+2. 物种是「享元」：同名物种全局只有一个 Species 对象，实例只保存一个指向它的引用
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+# ==================== 享元：物种 ====================
+print("=== 享元 ===")
+
+
+class Species:
+    """物种信息；同名物种只创建一次，所有动物共享"""
+
+    __slots__ = ("name",)
+    _registry = {}
+
+    def __init__(self, name):
+        self.name = name
+
+    @classmethod
+    def of(cls, name):
+        """取得（必要时创建）名为 name 的物种；名字先 sys.intern，内容相同的字符串也只留一份"""
+        species = cls._registry.get(name)
+        if species is None:
+            species = cls._registry[name] = cls(sys.intern(name))
+        return species
+
+    def __repr__(self):
+        return f"Species({self.name!r})"
+
+
+print(f"同一个对象: {Species.of('猫') is Species.of(''.join(['猫']))}")
+
+# ==================== 带 __slots__ 的继承体系 ====================
+print("\n=== 带 __slots__ 的继承体系 ===")
+
+# 子类只需在 __slots__ 里写「新增」的属性；父类的槽位会被继承
+# 继承链上只要有一个类没写 __slots__，实例就又会有 __dict__
+
+
+class Animal:
+    """动物基类"""
+
+    __slots__ = ("name", "_species")
+
+    def __init__(self, name, species):
+        self.name = name
+        self._species = species if isinstance(species, Species) else Species.of(species)
+
+    @property
+    def species(self):
+        """对外仍然是物种名字符串，与原来的 animal.species 用法一致"""
+        return self._species.name
+
+    def make_sound(self):
+        """发出声音（父类的通用实现）"""
+        return f"{self.name} 发出声音"
+
+    def describe(self):
+        """描述动物"""
+        return f"{self.name} 是一只 {self.species}"
+
+
+class Cat(Animal):
+    """猫类"""
+
+    __slots__ = ("color",)
+    SPECIES = Species.of("猫")
+
+    def __init__(self, name, color):
+        super().__init__(name, self.SPECIES)
+        self.color = color
+
+    def make_sound(self):
+        """猫的声音"""
+        return f"{self.name} 说: 喵喵!"
+
+    def purr(self):
+        """打呼噜"""
+        return f"{self.name} 发出呼噜声"
+
+
+class Dog(Animal):
+    """狗类"""
+
+    __slots__ = ("breed",)
+    SPECIES = Species.of("狗")
+
+    def __init__(self, name, breed):
+        super().__init__(name, self.SPECIES)
+        self.breed = breed
+
+    def make_sound(self):
+        """狗的声音"""
+        return f"{self.name} 说: 汪汪!"
+
+    def fetch(self):
+        """捡球"""
+        return f"{self.name} 去捡球了"
+
+
+cat = Cat("咪咪", "白色")
+dog = Dog("旺财", "金毛")
+print(cat.describe())
+print(cat.make_sound())
+print(cat.purr())
+print(dog.describe())
+print(dog.fetch())
+print(f"没有 __dict__: {not hasattr(cat, '__dict__')}，共享物种: {cat._species is Cat('小白', '白色')._species}")
+try:
+    cat.nickname = "咪"
+except AttributeError as e:
+    print(f"不能随意添加属性: {e}")
+
+# ==================== 行为与原写法一致 ====================
+
+
+class DictAnimal:
+    """原写法"""
+
+    def __init__(self, name, species):
+        self.name = name
+        self.species = species
+
+    def make_sound(self):
+        return f"{self.name} 发出声音"
+
+    def describe(self):
+        return f"{self.name} 是一只 {self.species}"
+
+
+class DictCat(DictAnimal):
+    def __init__(self, name, color):
+        super().__init__(name, "猫")
+        self.color = color
+
+    def make_sound(self):
+        return f"{self.name} 说: 喵喵!"
+
+
+class DictDog(DictAnimal):
+    def __init__(self, name, breed):
+        super().__init__(name, "狗")
+        self.breed = breed
+
+    def make_sound(self):
+        return f"{self.name} 说: 汪汪!"
+
+
+pairs = [(Cat, DictCat, "小黑", "黑色"), (Dog, DictDog, "大黄", "柴犬"), (Animal, DictAnimal, "小绿", "鹦鹉")]
+for new_cls, old_cls, name, extra in pairs:
+    a, b = new_cls(name, extra), old_cls(name, extra)
+    assert (a.describe(), a.make_sound(), a.species) == (b.describe(), b.make_sound(), b.species)
+assert isinstance(cat, Animal) and issubclass(Dog, Animal)
+print("\ndescribe / make_sound / species 与原写法结果一致，继承关系不变")
+
+# ==================== 基准测试：100 万只动物 ====================
+print("\n=== 基准测试：100 万只动物 ===")
+
+N = 1_000_000
+# 模拟从文件读入：物种名是每行各自的新字符串（不是代码里的同一个字面量）
+rows = [("猫" if i % 3 else "狗") + "\n" for i in range(N)]
+names = [f"动物{i % 1000}" for i in range(N)]  # 名字也共享，测到的只是「实例本身」的差异
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    return objects, size / N, time.perf_counter() - start
+
+
+old, old_bytes, old_time = measure(lambda: [DictAnimal(n, s.rstrip()) for n, s in zip(names, rows)])
+new, new_bytes, new_time = measure(lambda: [Animal(n, s.rstrip()) for n, s in zip(names, rows)])
+
+assert [a.describe() for a in old[:1000]] == [a.describe() for a in new[:1000]]
+print(f"__dict__ + 各自的物种字符串: {old_bytes:6.1f} 字节/只, 创建 {old_time * 1000:5.0f} ms")
+print(f"__slots__ + 物种享元:        {new_bytes:6.1f} 字节/只, 创建 {new_time * 1000:5.0f} ms")
+print(f"100 万只共节省约 {(old_bytes - new_bytes) * N / 2 ** 20:.0f} MB")
+
+# 虽然多了一次 Species.of 查找，但不用为每个实例分配 __dict__，创建反而更快
+# 物种名如果本来就是同一个字符串对象（如代码里的字面量），节省的主要来自去掉 __dict__；
+# 物种信息越多（学名、分类、图片……），享元省下的内存越多
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 继承体系里每个类都要写 __slots__，子类只写新增的属性")
+print("• 享元：重复的数据只存一份，实例保存引用")
+print("• sys.intern 让内容相同的字符串变成同一个对象")
+print("• 用 property 保持原来的访问方式（animal.species 仍是字符串）")
+
+print("\n=== 练习题 ===")
+print("1. 给 Species 增加 sound 字段，让 Animal.make_sound 默认使用物种的叫声")
+print("2. 对 Cat 的 color 也用 sys.intern，测一下 100 万只猫能再省多少内存")
+print("3. 去掉 Dog 的 __slots__，用 hasattr(dog, '__dict__') 看看会发生什么")
@@ -0,0 +1,257 @@
+"""
+Python 性能优化 - 按类型批量分派
+02_面向对象/01_类和对象 的多态示例对混合列表逐个调用 animal_sound(animal)：
+每个对象都要查找一次方法、调用一次 Python 函数
+当集合里有几百万个对象、但只有少数几种类型时，可以先按具体类型分组：
+每组只查找一次方法，类型提供了批量实现（如 Cat.make_sound_batch）就整组交给它，结果再按原顺序放回
+"""
+
+import os
+import random
+import tempfile
+import time
+from array import array
+
+# ==================== 支持批量方法的动物类 ====================
+print("=== 批量方法 ===")
+
+
+class Animal:
+    """动物基类（带 __slots__，见 20_槽位与享元）"""
+
+    __slots__ = ("name", "species")
+
+    def __init__(self, name, species):
+        self.name = name
+        self.species = species
+
+    def make_sound(self):
+        return f"{self.name} 发出声音"
+
+    def describe(self):
+        return f"{self.name} 是一只 {self.species}"
+
+    @classmethod
+    def describe_batch(cls, animals):
+        """批量版本：一个列表推导式处理整组，f-string 直接内联，没有逐个的方法查找和调用"""
+        return [f"{a.name} 是一只 {a.species}" for a in animals]
+
+    def save(self, path):
+        """追加写入一行档案：每次调用都要打开、关闭一次文件"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{self.describe()}\n")
+        return path
+
+    @classmethod
+    def save_batch(cls, animals, path):
+        """批量版本：整组只打开一次文件、只写一次"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{line}\n" for line in cls.describe_batch(animals)))
+        return [path] * len(animals)
+
+
+class Cat(Animal):
+    __slots__ = ("color",)
+
+    def __init__(self, name, color):
+        super().__init__(name, "猫")
+        self.color = color
+
+    def make_sound(self):
+        return f"{self.name} 说: 喵喵!"
+
+    @classmethod
+    def make_sound_batch(cls, cats):
+        return [f"{c.name} 说: 喵喵!" for c in cats]
+
+
+class Dog(Animal):
+    __slots__ = ("breed",)
+
+    def __init__(self, name, breed):
+        super().__init__(name, "狗")
+        self.breed = breed
+
+    def make_sound(self):
+        return f"{self.name} 说: 汪汪!"
+
+    @classmethod
+    def make_sound_batch(cls, dogs):
+        return [f"{d.name} 说: 汪汪!" for d in dogs]
+
+
+class Parrot(Animal):
+    """没有批量实现：走逐个调用的后备路径"""
+
+    __slots__ = ()
+
+    def __init__(self, name):
+        super().__init__(name, "鹦鹉")
+
+    def make_sound(self):
+        return f"{self.name} 说: 你好!"
+
+
+class Kitten(Cat):
+    """重写了 make_sound，却继承了 Cat.make_sound_batch —— 分派时必须发现这一点，不能用父类的批量实现"""
+
+    __slots__ = ()
+
+    def make_sound(self):
+        return f"{self.name} 说: 咪~"
+
+
+# ==================== 按类型分组的集合 ====================
+
+
+def _owner(cls, attr):
+    """沿 MRO 找到真正定义 attr 的类"""
+    return next((c for c in cls.__mro__ if attr in c.__dict__), None)
+
+
+class TypedCollection:
+    """
+    按具体类型分组存放对象，同时用一个小整数数组记住每个位置上是哪一组
+    call(method)：对每一组
+    - 类型有 <method>_batch，且它和 <method> 定义在同一个类上 → 整组调用批量实现，它要返回与该组等长的序列
+    - 否则 → 只查找一次 cls.<method>，再 map 到整组（省掉了每个对象的方法查找）
+    最后按组号数组从各组结果里依次取值，还原成对象加入的顺序
+    """
+
+    def __init__(self, items=()):
+        self._groups = {}  # 类型 → 组号
+        self._members = []  # 组号 → 该组的对象列表
+        self._kinds = array("H")  # 第 i 个对象属于哪一组
+        self.extend(items)
+
+    def append(self, item):
+        kind = self._groups.get(type(item))
+        if kind is None:
+            kind = self._groups[type(item)] = len(self._members)
+            self._members.append([])
+        self._members[kind].append(item)
+        self._kinds.append(kind)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def _gather(self, per_group):
+        """per_group[k] 是第 k 组按组内顺序排列的结果；按 _kinds 轮流从各组取下一个，全程在 C 里"""
+        iterators = [iter(results) for results in per_group]
+        return list(map(next, map(iterators.__getitem__, self._kinds)))
+
+    def __iter__(self):
+        """按加入顺序遍历"""
+        return iter(self._gather(self._members))
+
+    def group_sizes(self):
+        return {cls.__name__: len(self._members[kind]) for cls, kind in self._groups.items()}
+
+    def call(self, method, *args, use_batch=True):
+        """对所有对象调用 method(*args)，返回按加入顺序排列的结果"""
+        batch_name = method + "_batch"
+        per_group = []
+        for cls, kind in self._groups.items():
+            items = self._members[kind]
+            owner = _owner(cls, batch_name) if use_batch else None
+            if owner is not None and owner is _owner(cls, method):
+                results = getattr(cls, batch_name)(items, *args)
+                if len(results) != len(items):  # 少了的话 _gather 会悄悄截断，多了会错位
+                    raise ValueError(f"{cls.__name__}.{batch_name} 返回了 {len(results)} 个结果，应为 {len(items)} 个")
+                per_group.append(results)
+            elif args:
+                func = getattr(cls, method)
+                per_group.append([func(item, *args) for item in items])
+            else:
+                per_group.append(map(getattr(cls, method), items))
+        return self._gather(per_group)
+
+
+animals = TypedCollection([Cat("小白", "白色"), Dog("大黄", "柴犬"), Parrot("阿蓝"), Kitten("小咪", "橘色"), Cat("小黑", "黑色")])
+print("所有动物发声（顺序不变）:")
+for sound in animals.call("make_sound"):
+    print(f"  {sound}")
+print(f"describe 由基类的批量实现处理: {animals.call('describe')[:2]}")
+print(f"分组: {animals.group_sizes()}")
+
+
+class Lion(Animal):
+    __slots__ = ()
+
+    def make_sound(self):
+        return f"{self.name} 说: 吼!"
+
+    @classmethod
+    def make_sound_batch(cls, lions):
+        return [f"{lion.name} 说: 吼!" for lion in lions[:1]]  # 故意漏掉后面的
+
+
+try:
+    TypedCollection([Lion("辛巴", "狮子"), Lion("娜娜", "狮子")]).call("make_sound")
+except ValueError as e:
+    print(f"批量实现返回的结果个数不对: {e}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：100 万只动物发声 ===")
+
+N = 1_000_000
+rng = random.Random(21)
+kinds = [(Cat, "白色"), (Dog, "柴犬")]
+mixed = [cls(f"动物{i}", extra) for i in range(N) for cls, extra in [rng.choice(kinds)]]
+herd = TypedCollection(mixed)
+
+
+def animal_sound(animal):
+    """原写法去掉了 print"""
+    return animal.make_sound()
+
+
+cases = [
+    ("逐个 animal_sound", lambda: [animal_sound(a) for a in mixed]),
+    ("逐个 a.make_sound()", lambda: [a.make_sound() for a in mixed]),
+    ("分组 + 逐个调用", lambda: herd.call("make_sound", use_batch=False)),
+    ("分组 + 批量实现", lambda: herd.call("make_sound")),
+]
+expected = [a.make_sound() for a in mixed]
+baseline = None
+for label, run in cases:
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    baseline = baseline or elapsed
+    assert result == expected
+    print(f"{label:<22} {elapsed * 1000:7.0f} ms（{baseline / elapsed:4.1f} 倍）")
+
+# 结果基本持平：CPython 3.11 会对方法调用做特化，make_sound 这种轻量方法，逐个调用的开销本来就不大，
+# 分组后省下的查找又被「按原顺序取回结果」抵消了
+
+print("\n=== 基准测试：2 万只动物写档案 ===")
+
+# 批量实现真正有用的地方：每次调用都有固定开销（打开文件、网络往返、数据库提交），批量时只付一次
+small = TypedCollection(mixed[:20_000])
+with tempfile.TemporaryDirectory() as workdir:
+    for label, use_batch in [("逐个 save", False), ("分组 + save_batch", True)]:
+        path = os.path.join(workdir, f"{use_batch}.txt")
+        start = time.perf_counter()
+        small.call("save", path, use_batch=use_batch)
+        elapsed = time.perf_counter() - start
+        with open(path, encoding="utf-8") as f:
+            # 返回值保持原顺序，但副作用（写文件）是按组发生的，所以只比较内容
+            assert sorted(f.read().splitlines()) == sorted(small.call("describe"))
+        print(f"{label:<22} {elapsed * 1000:7.0f} ms")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 按具体类型分组：每组只查找一次方法")
+print("• 类型提供 xxx_batch 时整组处理；每次调用有固定开销（文件、网络）时收益最大")
+print("• 子类重写了方法却继承了父类的批量实现时，不能用它 —— 用 MRO 检查两者是否定义在同一个类上")
+print("• 用组号数组记录每个位置属于哪一组，结果按原顺序取回")
+
+print("\n=== 练习题 ===")
+print("1. 给 TypedCollection 增加 remove(item)，删除后 call 的结果顺序仍然正确")
+print("2. 让 call 也支持关键字参数，比如 call('describe', prefix='>>')")
+print("3. 如果集合里有 1000 种类型、每种只有几个对象，分组还划算吗？")
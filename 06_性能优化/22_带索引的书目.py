@@ -0,0 +1,250 @@
+"""
+Python 性能优化 - 可哈希、带索引的书目
+02_面向对象/01_类和对象 的 Book 定义了 __eq__ 却没有 __hash__：Python 会把 __hash__ 设为 None，
+书不能放进 set、不能当 dict 的键，去重只能 `if book not in books`（O(n²)）；
+sorted(books) 每次比较还要调用一次 Python 写的 __lt__
+这里：
+1. Book 按 (书名, 作者) 定义 __hash__，与 __eq__ 保持一致
+2. BookCatalog：dict 去重，按作者的二级索引，按页数的有序索引（bisect 做范围查询）
+3. 排序用 key=attrgetter(...)，每本书只取一次键，比较在 C 里完成
+"""
+
+import random
+import time
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+# ==================== 可哈希的 Book ====================
+print("=== 可哈希的 Book ===")
+
+
+class Book:
+    """书籍类：相等与哈希都只看 (书名, 作者)"""
+
+    __slots__ = ("title", "author", "pages")
+
+    def __init__(self, title, author, pages):
+        self.title = title
+        self.author = author
+        self.pages = pages
+
+    def __str__(self):
+        return f"《{self.title}》 by {self.author}"
+
+    def __repr__(self):
+        return f"Book('{self.title}', '{self.author}', {self.pages})"
+
+    def __len__(self):
+        return self.pages
+
+    def __eq__(self, other):
+        if isinstance(other, Book):
+            return self.title == other.title and self.author == other.author
+        return NotImplemented  # 交给对方判断，而不是直接返回 False
+
+    # 相等的对象必须有相同的哈希值：所以哈希也只用 (书名, 作者)，不能包含 pages
+    def __hash__(self):
+        return hash((self.title, self.author))
+
+    def __lt__(self, other):
+        return self.pages < other.pages
+
+
+book1 = Book("Python 编程", "张三", 300)
+same = Book("Python 编程", "张三", 320)  # 再版：页数不同，但仍是同一本书
+print(f"相等: {book1 == same}, 哈希相同: {hash(book1) == hash(same)}")
+print(f"放进 set 去重: {set([book1, same, Book('Swift 开发', '李四', 250)])}")
+
+# ==================== 书目 ====================
+print("\n=== 书目 ===")
+
+by_pages = attrgetter("pages")
+
+
+class BookCatalog:
+    """
+    - 主索引：dict (书名, 作者) → Book，add 时去重，O(1)
+    - 作者索引：dict 作者 → [Book, ...]
+    - 页数索引：按页数排好序的两个平行列表（页数、书），用 bisect 做范围查询
+      索引建好后的增删先记在 _pending 里，下次查询时：
+      - 改动不多：逐条用 bisect 找到位置再插入 / 删除（每条是一次 C 层的内存移动）
+      - 改动超过 REBUILD_AFTER 条（比如批量导入）：整体重新排序一次，比逐条插入快
+    """
+
+    REBUILD_AFTER = 1_000
+
+    def __init__(self, books=()):
+        self._by_key = {}
+        self._by_author = {}
+        self._page_keys = []
+        self._page_books = []
+        self._pending = []  # 索引建好之后的改动：(book, True 表示加入 / False 表示删除)
+        self._stale = True  # 需要整体重建
+        self.add_many(books)
+
+    def _changed(self, book, added):
+        if self._stale:
+            return
+        self._pending.append((book, added))
+        if len(self._pending) > self.REBUILD_AFTER:
+            self._pending.clear()
+            self._stale = True
+
+    def add(self, book):
+        """加入一本书；已有同名同作者的书时不加入，返回 False"""
+        key = (book.title, book.author)
+        if key in self._by_key:
+            return False
+        self._by_key[key] = book
+        self._by_author.setdefault(book.author, []).append(book)
+        self._changed(book, True)
+        return True
+
+    def add_many(self, books):
+        """批量加入，返回实际加入的数量"""
+        add = self.add
+        return sum(map(add, books))
+
+    def remove(self, title, author):
+        book = self._by_key.pop((title, author))
+        self._by_author[author].remove(book)
+        self._changed(book, False)
+        return book
+
+    def get(self, title, author, default=None):
+        return self._by_key.get((title, author), default)
+
+    def __contains__(self, book):
+        return (book.title, book.author) in self._by_key
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(self._by_key.values())
+
+    def by_author(self, author):
+        return list(self._by_author.get(author, ()))
+
+    def _rebuild_page_index(self):
+        books = sorted(self._by_key.values(), key=by_pages)
+        self._page_books = books
+        self._page_keys = list(map(by_pages, books))
+        self._stale = False
+
+    def _sync_page_index(self):
+        if self._stale:
+            self._rebuild_page_index()
+            return
+        keys, books = self._page_keys, self._page_books
+        for book, added in self._pending:
+            if added:
+                # 插到同页数的书之后：与整体重建时按加入顺序的稳定排序结果相同
+                i = bisect_right(keys, book.pages)
+                keys.insert(i, book.pages)
+                books.insert(i, book)
+            else:
+                i = bisect_left(keys, book.pages)
+                while books[i] is not book:
+                    i += 1
+                del keys[i], books[i]
+        self._pending.clear()
+
+    def pages_between(self, low, high):
+        """页数在 [low, high] 之间的书，按页数排列：O(log n + 结果数)"""
+        if self._stale or self._pending:
+            self._sync_page_index()
+        start = bisect_left(self._page_keys, low)
+        end = bisect_right(self._page_keys, high)
+        return self._page_books[start:end]
+
+    def sorted_by(self, field, reverse=False):
+        """按任意字段排序：每本书只取一次键，比较在 C 里完成"""
+        return sorted(self._by_key.values(), key=attrgetter(field), reverse=reverse)
+
+
+catalog = BookCatalog([
+    book1,
+    Book("Swift 开发", "李四", 250),
+    Book("Java 编程", "王五", 400),
+    Book("Python 进阶", "张三", 520),
+])
+print(f"重复加入: {catalog.add(same)}，共 {len(catalog)} 本")
+print(f"张三的书: {catalog.by_author('张三')}")
+print(f"300~450 页: {catalog.pages_between(300, 450)}")
+print(f"按书名排序: {[b.title for b in catalog.sorted_by('title')]}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：100 万本书 ===")
+
+N = 1_000_000
+rng = random.Random(22)
+authors = [f"作者{i}" for i in range(20_000)]
+# 书名编号随机抽取，有一部分会重复；作者由书名编号决定，所以书名相同就是同一本书
+numbers = [rng.randrange(N) for _ in range(N)]
+raw = [Book(f"书{t}", authors[t % len(authors)], rng.randint(50, 1500)) for t in numbers]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+big, t_insert = timed(lambda: BookCatalog(raw))
+print(f"插入 + 去重 {N:,} 本: {t_insert * 1000:6.0f} ms，去重后 {len(big):,} 本")
+
+# 原写法只能线性去重：只在前 3000 本上演示，再按 O(n²) 估算
+SMALL = 3_000
+unique_list, t_naive = timed(lambda: [b for i, b in enumerate(raw[:SMALL]) if b not in raw[:i]])
+_, t_set = timed(lambda: list(dict.fromkeys(raw[:SMALL])))
+assert unique_list == list(dict.fromkeys(raw[:SMALL]))
+print(f"前 {SMALL} 本去重: `not in` 列表 {t_naive * 1000:6.1f} ms，dict.fromkeys {t_set * 1000:5.2f} ms"
+      f"（100 万本时约慢 {(N / SMALL) ** 2 * t_naive / 3600:.0f} 小时 vs 秒级）")
+
+_, t_index = timed(lambda: big.pages_between(0, 0))  # 第一次查询触发建索引
+QUERIES = 200
+ranges = [(lo, lo + rng.randint(0, 20)) for lo in (rng.randint(50, 1500) for _ in range(QUERIES))]
+books_list = list(big)
+scan, t_scan = timed(lambda: [[b for b in books_list if lo <= b.pages <= hi] for lo, hi in ranges[:20]])
+found, t_bisect = timed(lambda: [big.pages_between(lo, hi) for lo, hi in ranges])
+assert [sorted(map(id, r)) for r in scan] == [sorted(map(id, r)) for r in found[:20]]
+print(f"建页数索引: {t_index * 1000:6.0f} ms（只在插入后第一次查询时发生）")
+print(f"页数范围查询: 线性扫描 {t_scan / 20 * 1000:7.2f} ms/次，bisect {t_bisect / QUERIES * 1000:6.3f} ms/次")
+
+# 增删和查询交替进行：每次只有一两条待处理的改动，逐条插入 / 删除，不再整体重建
+ROUNDS = 1_000
+extra = [Book(f"新书{i}", "新作者", rng.randint(50, 1500)) for i in range(ROUNDS)]
+
+
+def add_remove_query():
+    for i, book in enumerate(extra):
+        big.add(book)
+        if i % 2:
+            big.remove(extra[i - 1].title, extra[i - 1].author)
+        big.pages_between(300, 310)
+
+
+_, t_mixed = timed(add_remove_query)
+incremental = big.pages_between(0, 2000)
+big._rebuild_page_index()
+assert incremental == big.pages_between(0, 2000)
+print(f"增删与查询交替: {t_mixed / ROUNDS * 1000:6.3f} ms/次（整体重建一次要 {t_index * 1000:.0f} ms）")
+
+by_lt, t_lt = timed(lambda: sorted(books_list))
+by_key, t_key = timed(lambda: sorted(books_list, key=by_pages))
+assert [b.pages for b in by_lt] == [b.pages for b in by_key]
+print(f"按页数排序: sorted(__lt__) {t_lt * 1000:6.0f} ms，key=attrgetter {t_key * 1000:6.0f} ms"
+      f"（{t_lt / t_key:.1f} 倍）")
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 定义 __eq__ 时要同时定义 __hash__，并且只用参与相等比较的字段")
+print("• dict / set 去重是 O(n)；列表 `not in` 去重是 O(n²)")
+print("• 有序列表 + bisect：范围查询 O(log n)；零星改动逐条插入，批量插入后整体重建")
+print("• sorted 用 key 函数：每个元素只取一次键，比较交给 C")
+
+print("\n=== 练习题 ===")
+print("1. 给 BookCatalog 增加按书名前缀查询（提示：对书名排序后 bisect）")
+print("2. 如果书名或作者可以修改，哈希会出什么问题？怎样避免？")
+print("3. 把页数索引换成 array('l')，比较内存和查询速度")
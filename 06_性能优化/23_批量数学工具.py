@@ -0,0 +1,180 @@
+"""
+Python 性能优化 - 批量数学工具
+02_面向对象/01_类和对象 的 MathUtils.circle_area(cls, radius) 一次只算一个半径，
+而且用的是截断的 pi = 3.14159；每个请求要算几百万个图形的面积时，逐个调用太慢
+这里给 MathUtils 增加批量版本：
+1. circle_area_many / add_many / multiply_many：输入输出都是 array('d')，按块处理，临时内存有上限
+2. 安装了 NumPy 就自动用它（整块在 C 里向量化计算），没有安装也能用纯 Python 版本
+3. exact=True 时使用 math.pi
+"""
+
+import math
+import time
+from array import array
+from itertools import repeat
+from operator import add, mul
+
+# NumPy 是可选依赖：没装也能运行，只是走纯 Python 的按块实现（见 04_模块和包/02_包管理）
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# ==================== 批量版本 ====================
+print("=== 批量数学工具 ===")
+
+CHUNK = 65_536
+
+
+def _as_doubles(values):
+    """array('d') 和格式为 'd' 的 memoryview 直接使用（不复制），其他可迭代对象转成 array('d')"""
+    if isinstance(values, array) and values.typecode == "d":
+        return values
+    if isinstance(values, memoryview) and values.format == "d":
+        return values
+    return array("d", values)
+
+
+def _empty(n):
+    """长度为 n 的 array('d')，一次分配好，之后按块填入"""
+    return array("d", bytes(8 * n))
+
+
+def _use_numpy(use_numpy):
+    """use_numpy=None：装了就用；True：必须用；False：不用"""
+    if use_numpy and numpy is None:
+        raise ImportError("需要 NumPy: pip3 install numpy")
+    return numpy is not None if use_numpy is None else use_numpy
+
+
+def _binary_many(a, b, op, numpy_op, chunk_size, use_numpy):
+    """两个等长序列（或一个序列 + 一个数字）逐元素运算，结果是 array('d')"""
+    scalar_a, scalar_b = isinstance(a, (int, float)), isinstance(b, (int, float))
+    if scalar_a and scalar_b:
+        raise TypeError("至少要有一个参数是序列；两个数字请用 MathUtils.add / multiply")
+    a = a if scalar_a else _as_doubles(a)
+    b = b if scalar_b else _as_doubles(b)
+    n = len(b) if scalar_a else len(a)
+    if not (scalar_a or scalar_b) and len(a) != len(b):
+        raise ValueError(f"长度不一致: {len(a)} != {len(b)}")
+
+    out = _empty(n)
+    if _use_numpy(use_numpy):
+        # numpy.frombuffer 直接包装 array 的内存，out= 把结果写回 out，不产生额外的副本
+        xs = a if scalar_a else numpy.frombuffer(a)
+        ys = b if scalar_b else numpy.frombuffer(b)
+        numpy_op(xs, ys, out=numpy.frombuffer(out))
+        return out
+
+    for start in range(0, n, chunk_size):
+        end = min(start + chunk_size, n)
+        xs = repeat(a) if scalar_a else memoryview(a)[start:end]
+        ys = repeat(b) if scalar_b else memoryview(b)[start:end]
+        out[start:end] = array("d", map(op, xs, ys))
+    return out
+
+
+class MathUtils:
+    """数学工具类：保留原来的标量方法，新增批量方法"""
+
+    pi = 3.14159  # 与原来相同；exact=True 时改用 math.pi
+
+    @classmethod
+    def circle_area(cls, radius, exact=False):
+        """计算圆的面积（类方法）"""
+        return (math.pi if exact else cls.pi) * radius ** 2
+
+    @staticmethod
+    def add(a, b):
+        return a + b
+
+    @staticmethod
+    def multiply(a, b):
+        return a * b
+
+    # ---------- 批量版本 ----------
+    @classmethod
+    def circle_area_many(cls, radii, exact=False, chunk_size=CHUNK, use_numpy=None):
+        """
+        一批半径的面积，返回 array('d')
+        纯 Python 版本按块计算：每块生成一个临时列表再写入结果数组，临时内存只与 chunk_size 有关
+        """
+        pi = math.pi if exact else cls.pi
+        radii = _as_doubles(radii)
+        n = len(radii)
+        out = _empty(n)
+        if _use_numpy(use_numpy):
+            r = numpy.frombuffer(radii)
+            result = numpy.frombuffer(out)
+            numpy.multiply(r, r, out=result)
+            result *= pi
+            return out
+        view = memoryview(radii)
+        for start in range(0, n, chunk_size):
+            end = min(start + chunk_size, n)
+            out[start:end] = array("d", [pi * r * r for r in view[start:end]])
+        return out
+
+    @staticmethod
+    def add_many(a, b, chunk_size=CHUNK, use_numpy=None):
+        """逐元素相加；其中一个参数可以是数字（广播）"""
+        return _binary_many(a, b, add, numpy and numpy.add, chunk_size, use_numpy)
+
+    @staticmethod
+    def multiply_many(a, b, chunk_size=CHUNK, use_numpy=None):
+        """逐元素相乘；其中一个参数可以是数字（广播）"""
+        return _binary_many(a, b, mul, numpy and numpy.multiply, chunk_size, use_numpy)
+
+
+radii = array("d", [1.0, 2.0, 5.0])
+print(f"圆的面积: {MathUtils.circle_area(5)}")
+print(f"批量面积: {MathUtils.circle_area_many(radii, use_numpy=False).tolist()}")
+print(f"精确 pi:  {MathUtils.circle_area_many(radii, exact=True, use_numpy=False).tolist()}")
+print(f"截断 pi 的相对误差: {(math.pi - MathUtils.pi) / math.pi:.2e}")
+print(f"批量加法: {MathUtils.add_many(radii, [10, 20, 30], use_numpy=False).tolist()}")
+print(f"批量乘法（广播）: {MathUtils.multiply_many(radii, 3, use_numpy=False).tolist()}")
+print(f"NumPy: {'已安装，默认使用' if numpy is not None else '未安装，使用纯 Python 按块实现'}")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试：100 万个半径 ===")
+
+N = 1_000_000
+big = array("d", (i * 0.001 for i in range(N)))
+expected = array("d", [MathUtils.circle_area(r) for r in big])
+
+cases = [
+    ("逐个 circle_area", lambda: array("d", [MathUtils.circle_area(r) for r in big])),
+    ("circle_area_many", lambda: MathUtils.circle_area_many(big, use_numpy=False)),
+    ("multiply_many(纯 Python)", lambda: MathUtils.multiply_many(big, big, use_numpy=False)),
+]
+if numpy is not None:
+    cases += [
+        ("circle_area_many(NumPy)", lambda: MathUtils.circle_area_many(big, use_numpy=True)),
+        ("multiply_many(NumPy)", lambda: MathUtils.multiply_many(big, big, use_numpy=True)),
+    ]
+
+baseline = None
+for label, run in cases:
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    baseline = baseline or elapsed
+    if "circle" in label:
+        # 浮点乘法的顺序不同（pi * r * r 与 pi * r ** 2），最后一位可能不同
+        assert all(map(math.isclose, result, expected))
+    print(f"{label:<26} {N / elapsed / 1e6:6.1f} M 个/秒（{baseline / elapsed:5.1f} 倍）")
+
+# 纯 Python 版本的收益来自：没有逐个的方法调用、pi 只查找一次、结果直接写进 array('d')
+# NumPy 版本整块在 C 里计算，通常还能再快一到两个数量级
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 批量方法：一次调用处理整个数组，省掉逐个的函数调用")
+print("• 按块处理：memoryview 切片不复制，临时内存只与块大小有关")
+print("• 可选依赖用 try / except ImportError，装了 NumPy 就自动加速")
+print("• 需要精度时用 math.pi，不要手写截断的常数")
+
+print("\n=== 练习题 ===")
+print("1. 增加 rectangle_area_many(widths, heights)")
+print("2. 比较 chunk_size 为 1024、65536、100 万时的速度和峰值内存")
+print("3. 安装 NumPy 后重新运行，对比两种实现的速度")
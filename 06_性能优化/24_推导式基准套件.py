@@ -0,0 +1,249 @@
+"""
+Python 性能优化 - 推导式与生成器的基准套件
+03_高级特性/01_列表推导式和生成器 说 [x ** 2 for x in range(1000000)]「占用较多内存」、
+生成器「几乎不占额外内存」，但没有测过
+这里对其中的 平方 / 偶数 / 展平 三个例子，分别用
+列表推导式、生成器表达式、map 等 C 迭代器、array、按块处理 五种写法，在几种规模下测量：
+1. 耗时：构造结果并求和，取多次中最快的一次
+2. 峰值内存、结果占用：tracemalloc（单独跑一次，不和计时混在一起）
+3. 内存块数：构造出来、还没被消费的结果占着多少个内存块（sys.getallocatedblocks 的差）
+
+用法（在本目录下）：
+    python3 -m 24_推导式基准套件                         # 打印表格
+    python3 -m 24_推导式基准套件 --json -                # JSON 输出到标准输出
+    python3 -m 24_推导式基准套件 --json 24_推导式基准_基线.json   # 更新基线
+    python3 -m 24_推导式基准套件 --baseline 24_推导式基准_基线.json  # 与基线比较，有退化时退出码为 1
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from array import array
+from itertools import chain, compress, cycle, repeat
+
+CHUNK = 4096
+ROW = 100  # 展平例子里每一行的长度
+
+# ==================== 被测的写法 ====================
+# 每种写法都是 build(data) → 可迭代对象，统一用 sum 消费
+# 按块的写法每次只物化 CHUNK 个元素，build 返回的是各块部分和的生成器
+
+
+def _row_chunks(matrix):
+    rows_per_chunk = max(1, CHUNK // ROW)
+    return (matrix[i:i + rows_per_chunk] for i in range(0, len(matrix), rows_per_chunk))
+
+
+EXAMPLES = {
+    "squares": {
+        "data": lambda n: n,
+        "variants": {
+            "list": lambda n: [x ** 2 for x in range(n)],
+            "generator": lambda n: (x ** 2 for x in range(n)),
+            "map": lambda n: map(pow, range(n), repeat(2)),
+            "array": lambda n: array("q", (x ** 2 for x in range(n))),
+            "chunked": lambda n: (sum([x ** 2 for x in range(i, min(i + CHUNK, n))])
+                                  for i in range(0, n, CHUNK)),
+        },
+    },
+    "evens": {
+        "data": lambda n: n,
+        "variants": {
+            "list": lambda n: [x for x in range(n) if x % 2 == 0],
+            "generator": lambda n: (x for x in range(n) if x % 2 == 0),
+            "map": lambda n: compress(range(n), cycle((True, False))),
+            "array": lambda n: array("q", (x for x in range(n) if x % 2 == 0)),
+            "chunked": lambda n: (sum([x for x in range(i, min(i + CHUNK, n)) if x % 2 == 0])
+                                  for i in range(0, n, CHUNK)),
+        },
+    },
+    "flatten": {
+        # 输入矩阵在测量之前就建好，不算进任何一种写法的内存
+        "data": lambda n: [list(range(i, min(i + ROW, n))) for i in range(0, n, ROW)],
+        "variants": {
+            "list": lambda m: [num for row in m for num in row],
+            "generator": lambda m: (num for row in m for num in row),
+            "map": lambda m: chain.from_iterable(m),
+            "array": lambda m: array("q", chain.from_iterable(m)),
+            "chunked": lambda m: (sum([num for row in rows for num in row]) for rows in _row_chunks(m)),
+        },
+    },
+}
+
+# ==================== 测量 ====================
+
+
+def _time_ms(build, data, repeat_count):
+    best = float("inf")
+    for _ in range(repeat_count):
+        start = time.perf_counter()
+        sum(build(data))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _memory(build, data):
+    """
+    (结果占用的字节数, 构造 + 消费过程中的峰值字节数)
+    tracemalloc 会拖慢每一次分配，所以和计时分开跑
+    """
+    tracemalloc.start()
+    result = build(data)
+    retained, _ = tracemalloc.get_traced_memory()
+    sum(result)
+    _, peak = tracemalloc.get_traced_memory()
+    del result
+    tracemalloc.stop()
+    return retained, peak
+
+
+def _retained_blocks(build, data):
+    """
+    结果被构造出来、还没有被消费时多占了多少个内存块
+    CPython 没有便宜的办法统计「一共分配过多少次」，这里统计的是存活的块：
+    列表里的每个大整数都是一个块，生成器只有它自己的几个块
+    """
+    gc.collect()
+    before = sys.getallocatedblocks()
+    result = build(data)
+    blocks = sys.getallocatedblocks() - before
+    del result
+    return max(blocks, 0)
+
+
+def run_suite(sizes, repeat_count=3, examples=None):
+    """返回可以直接 json.dump 的结果"""
+    results = []
+    for name in examples or EXAMPLES:
+        spec = EXAMPLES[name]
+        for size in sizes:
+            data = spec["data"](size)
+            expected = None
+            for variant, build in spec["variants"].items():
+                total = sum(build(data))
+                if expected is None:
+                    expected = total
+                elif total != expected:
+                    raise AssertionError(f"{name}/{variant} 结果不一致: {total} != {expected}")
+                retained, peak = _memory(build, data)
+                results.append({
+                    "example": name,
+                    "variant": variant,
+                    "size": size,
+                    "time_ms": round(_time_ms(build, data, repeat_count), 3),
+                    "retained_bytes": retained,
+                    "peak_bytes": peak,
+                    "blocks": _retained_blocks(build, data),
+                })
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "sizes": list(sizes),
+        "repeat": repeat_count,
+        "chunk": CHUNK,
+        "results": results,
+    }
+
+
+# ==================== 与基线比较 ====================
+
+
+def compare(report, baseline, time_tolerance=0.5, memory_tolerance=0.1, memory_floor=16 * 1024):
+    """
+    返回退化列表 [(键, 指标, 基线值, 当前值), ...]
+    - 耗时和机器有关，默认允许慢 50%
+    - 峰值内存基本是确定的，默认允许多 10%，且差值小于 memory_floor 时忽略
+    基线里没有的组合（新增的写法或规模）不参与比较
+    """
+    def key(row):
+        return row["example"], row["variant"], row["size"]
+
+    old = {key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in report["results"]:
+        base = old.get(key(row))
+        if base is None:
+            continue
+        if row["time_ms"] > base["time_ms"] * (1 + time_tolerance):
+            regressions.append((key(row), "time_ms", base["time_ms"], row["time_ms"]))
+        grown = row["peak_bytes"] - base["peak_bytes"]
+        if grown > memory_floor and row["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append((key(row), "peak_bytes", base["peak_bytes"], row["peak_bytes"]))
+    return regressions
+
+
+# ==================== 命令行 ====================
+
+
+def _print_table(report):
+    print(f"Python {report['python']}，每项取 {report['repeat']} 次中最快的一次，按块大小 {report['chunk']}")
+    print(f"{'例子':<10}{'写法':<11}{'规模':>10}{'耗时 ms':>11}{'结果 KiB':>12}{'峰值 KiB':>12}{'内存块':>10}")
+    for row in report["results"]:
+        print(f"{row['example']:<12}{row['variant']:<11}{row['size']:>10,}{row['time_ms']:>11.2f}"
+              f"{row['retained_bytes'] / 1024:>12.1f}{row['peak_bytes'] / 1024:>12.1f}{row['blocks']:>10,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="推导式 / 生成器 / map / array / 按块 的耗时与内存基准")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="逗号分隔的输入规模")
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数，取最快的一次")
+    parser.add_argument("--examples", default=",".join(EXAMPLES), help="要跑的例子，逗号分隔")
+    parser.add_argument("--json", metavar="PATH", help="把结果写成 JSON；- 表示标准输出")
+    parser.add_argument("--baseline", metavar="PATH", help="与这个 JSON 基线比较")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    examples = args.examples.split(",")
+    unknown = set(examples) - set(EXAMPLES)
+    if unknown:
+        parser.error(f"未知的例子: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+    report = run_suite(sizes, args.repeat, examples)
+
+    quiet = args.json == "-"
+    if args.json:
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if quiet:
+            print(text)
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+    if not quiet:
+        _print_table(report)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.time_tolerance, args.memory_tolerance)
+        out = sys.stderr if quiet else sys.stdout
+        for (name, variant, size), metric, old, new in regressions:
+            print(f"退化: {name}/{variant}/{size:,} {metric}: {old} → {new}", file=out)
+        if not regressions:
+            print(f"与基线 {args.baseline} 相比没有退化", file=out)
+        if regressions:
+            return 1
+
+    if not quiet:
+        print("\n=== 小结 ===")
+        print("• 列表推导式：峰值内存与规模成正比（100 万个整数约 40 MiB）")
+        print("• 生成器表达式：峰值内存是常数，速度与列表推导式相近（略慢）")
+        print("• map / compress / chain：同样省内存，而且循环在 C 里，偶数和展平的例子最快")
+        print("• array：结果每个元素 8 字节，比列表 + 整数对象省得多；但 array 本身构造得慢，只在要长期保留结果时划算")
+        print("• 按块处理：内存上限由块大小决定，又能在块内用最快的列表推导式")
+        print("• 耗时和机器有关，比较基线时给宽一点的容差；内存几乎是确定的，可以卡得紧一些")
+
+        print("\n=== 练习题 ===")
+        print("1. 给 EXAMPLES 增加「奇偶标签」例子（[... if x % 2 == 0 else ... for x in ...]）")
+        print("2. 把 CHUNK 改成 256 和 65536，看看按块写法的耗时和峰值内存怎样变化")
+        print("3. 在另一台机器或另一个 Python 版本上用 --baseline 比较，哪些指标变了？")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
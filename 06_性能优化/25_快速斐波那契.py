@@ -0,0 +1,184 @@
+"""
+Python 性能优化 - 快速斐波那契
+03_高级特性/01_列表推导式和生成器 的 fibonacci(max_count) 要算第 n 项只能从头走 n 步；
+02_装饰器深入 的 fib(n) 靠递归 + lru_cache(maxsize=128)，fib(5000) 直接超出递归深度
+这里：
+1. fib(n)：快速倍增（fast doubling），按 n 的二进制位迭代，只需 O(log n) 次大整数乘法，没有递归
+2. fib_mod(n, m)：同样的算法，每一步取模，n = 10**18 也是瞬间算完
+3. fib_table(count, mod=None)：一次遍历生成前 count 项；取模时结果放进 array('Q')
+"""
+
+import functools
+import sys
+import time
+from array import array
+from itertools import islice
+
+# ==================== 快速倍增 ====================
+print("=== 快速倍增 ===")
+
+# 设 a = F(k)，b = F(k+1)，则
+#   F(2k)   = a * (2b - a)
+#   F(2k+1) = a² + b²
+# 从最高位开始扫描 n 的二进制：每一位先把 k 翻倍，该位是 1 再前进一步
+
+
+def _check_index(n):
+    if not isinstance(n, int) or isinstance(n, bool):
+        raise TypeError(f"n 应为 int，实际是 {type(n).__name__}")
+    if n < 0:
+        raise ValueError(f"n 不能为负数，实际是 {n}")
+
+
+def fib(n):
+    """第 n 个斐波那契数（F(0) = 0, F(1) = 1）"""
+    _check_index(n)
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        a, b = a * (2 * b - a), a * a + b * b
+        if bit == "1":
+            a, b = b, a + b
+    return a
+
+
+def fib_mod(n, m):
+    """F(n) % m；中间结果始终小于 m²，不会变成大整数"""
+    _check_index(n)
+    if not isinstance(m, int) or m < 1:
+        raise ValueError(f"模数应为正整数，实际是 {m!r}")
+    a, b = 0, 1 % m
+    for bit in bin(n)[2:]:
+        a, b = a * (2 * b - a) % m, (a * a + b * b) % m
+        if bit == "1":
+            a, b = b, (a + b) % m
+    return a
+
+
+def fib_table(count, mod=None):
+    """
+    前 count 项 F(0) .. F(count-1)，一次遍历
+    - mod 为 None：返回 list（Python 整数没有上限）
+    - 指定 mod：返回 array('Q')，每项 8 字节；要求 mod <= 2**64
+    """
+    _check_index(count)
+    if mod is None:
+        table = [0] * count
+        a, b = 0, 1
+        for i in range(count):
+            table[i] = a
+            a, b = b, a + b
+        return table
+    if not isinstance(mod, int) or not 1 <= mod <= 2 ** 64:
+        raise ValueError(f"mod 应在 1 到 2**64 之间，实际是 {mod!r}")
+    table = array("Q", bytes(8 * count))  # 一次分配好，再按下标填入
+    a, b = 0, 1 % mod
+    for i in range(count):
+        table[i] = a
+        a, b = b, (a + b) % mod
+    return table
+
+
+print(f"前 10 项: {fib_table(10)}")
+print(f"fib(100) = {fib(100)}")
+big = fib(5000)
+print(f"fib(5000) 有 {len(str(big))} 位，开头 {str(big)[:20]}...")
+print(f"fib_mod(10**18, 10**9 + 7) = {fib_mod(10 ** 18, 10 ** 9 + 7)}")
+print(f"前 10 项 mod 7: {fib_table(10, mod=7).tolist()}")
+for bad in (-1, 2.5):
+    try:
+        fib(bad)
+    except (TypeError, ValueError) as e:
+        print(f"fib({bad!r}) 失败: {type(e).__name__}: {e}")
+
+# ==================== 与原实现对照 ====================
+print("\n=== 与原实现对照 ===")
+
+
+def fibonacci(max_count):
+    """原写法：03_高级特性/01_列表推导式和生成器"""
+    a, b = 0, 1
+    count = 0
+    while count < max_count:
+        yield a
+        a, b = b, a + b
+        count += 1
+
+
+@functools.lru_cache(maxsize=128)
+def cached_fib(n):
+    """原写法：02_装饰器深入 的 fib"""
+    if n < 2:
+        return n
+    return cached_fib(n - 1) + cached_fib(n - 2)
+
+
+reference = list(fibonacci(2000))
+assert fib_table(2000) == reference
+assert all(fib(n) == reference[n] for n in range(2000))
+assert all(fib_mod(n, 1_000_003) == reference[n] % 1_000_003 for n in range(2000))
+assert fib_table(2000, mod=2 ** 64).tolist() == [x % 2 ** 64 for x in reference]
+assert cached_fib(300) == fib(300)
+print("fib / fib_mod / fib_table 的前 2000 项与 fibonacci 生成器一致")
+
+cached_fib.cache_clear()
+try:
+    cached_fib(5000)
+except RecursionError:
+    print(f"cached_fib(5000): RecursionError（递归上限 {sys.getrecursionlimit()}）")
+
+# ==================== 基准测试 ====================
+print("\n=== 基准测试 ===")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def nth_by_generator(n):
+    """用原生成器取第 n 项：走 n 步"""
+    return next(islice(fibonacci(n + 1), n, None))
+
+
+print("第 n 项:")
+for n in (1_000, 10_000, 100_000):
+    slow, t_slow = timed(lambda: nth_by_generator(n))
+    fast, t_fast = timed(lambda: fib(n))
+    assert slow == fast
+    print(f"  n = {n:>9,}: 生成器 {t_slow * 1000:8.2f} ms，快速倍增 {t_fast * 1000:6.3f} ms（{t_slow / t_fast:6.0f} 倍）")
+
+huge, t_huge = timed(lambda: fib(1_000_000))
+print(f"  n = {1_000_000:>9,}: 快速倍增 {t_huge * 1000:.0f} ms，结果 {huge.bit_length():,} 位二进制")
+_, t_mod = timed(lambda: fib_mod(10 ** 18, 10 ** 9 + 7))
+print(f"  fib_mod(10**18, 10**9+7): {t_mod * 1e6:.0f} µs（线性方法要走 10**18 步）")
+
+# 线性方法第 n 步要加两个 ~0.7n 位的数，总代价 O(n²)；快速倍增的代价由最后几次大整数乘法决定
+
+print("\n前 n 项:")
+N = 50_000
+M = 10 ** 9 + 7
+_, t_gen = timed(lambda: list(fibonacci(N)))
+_, t_table = timed(lambda: fib_table(N))
+by_gen, t_gen_mod = timed(lambda: array("Q", (x % M for x in fibonacci(N))))
+by_table, t_table_mod = timed(lambda: fib_table(N, mod=M))
+assert by_gen == by_table
+print(f"  list(fibonacci(N)):     {t_gen * 1000:7.0f} ms")
+print(f"  fib_table(N):           {t_table * 1000:7.0f} ms")
+print(f"  生成器 + 最后取模:      {t_gen_mod * 1000:7.0f} ms")
+print(f"  fib_table(N, mod=M):    {t_table_mod * 1000:7.0f} ms（每一步都取模，数字始终很小）")
+
+# 整张表必须逐项计算，所以 fib_table 不带 mod 时和生成器差不多，时间都花在大整数加法上；
+# 真正的收益来自取模：中间值不会变大，后面的每一步都是小整数运算
+
+# ==================== 小结与练习 ====================
+print("\n=== 小结 ===")
+print("• 快速倍增：F(2k)、F(2k+1) 由 F(k)、F(k+1) 算出，O(log n) 步")
+print("• 按二进制位迭代代替递归：没有递归深度限制，也不需要缓存")
+print("• 只关心余数时每一步都取模，数字不会变大")
+print("• 要整张表时一次遍历填入预先分配的 list / array")
+
+print("\n=== 练习题 ===")
+print("1. 用矩阵快速幂 [[1, 1], [1, 0]]^n 实现 fib，和快速倍增比较速度")
+print("2. 斐波那契数列模 m 是周期的（皮萨诺周期），写一个函数求出 m = 10 的周期")
+print("3. 写 fib_range(start, count)：先用 fib 求出 F(start)、F(start+1)，再一次遍历生成后面的项")